@@ -16,11 +16,19 @@ Change from previous version:
 
 import os
 import sqlite3
-import json
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from urllib.parse import quote
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+from db import open_ro
+
 st.set_page_config(
     page_title="ශ්‍රී ලංකා රජයේ චක්‍රලේඛ නිරීක්ෂණ පද්ධතිය",
     page_icon="🇱🇰",
@@ -30,104 +38,158 @@ st.set_page_config(
 
 DB_FILE    = "circulars.db"
 CHROMA_DIR = "./chroma_db"
+RECENT_N   = 5    # recent circulars shown per language
+PAGE_SIZE  = 50   # Browse table rows per page
+
+_NULL_DEADLINE = frozenset(("null", "None", ""))
+QA_LANGS       = {"සිංහල": "S", "Both": None, "English only": "E"}   # Q&A language choice → filter
+
+# RAG stack (chromadb / langchain) is imported once; pages show the error if it's missing
+try:
+    from qa_chain import answer_question, open_collection, clear_retrieval_cache, store_mismatch
+    _qa_err_msg = ""
+except ImportError as _qa_err:
+    answer_question = open_collection = clear_retrieval_cache = store_mismatch = None
+    _qa_err_msg     = str(_qa_err)
 
 
 # ── CSS ───────────────────────────────────────────────────────────────────────
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Noto+Sans+Sinhala:wght@400;600;700;800&family=Lora:wght@600;700&family=Plus+Jakarta+Sans:wght@400;500;600;700;800&display=swap');
-
-*, *::before, *::after { box-sizing: border-box; }
-html, body, .stApp, [data-testid="stAppViewContainer"] {
-    background: #f0f2f8 !important;
-    color: #1e2340;
-    font-family: 'Plus Jakarta Sans', sans-serif;
-    font-size: 15px;
-}
-section[data-testid="stSidebar"] {
-    background: linear-gradient(180deg, #1e2340 0%, #2a3060 100%) !important;
-    border-right: none !important;
-    box-shadow: 4px 0 24px rgba(0,0,0,0.18) !important;
-}
-section[data-testid="stSidebar"] .stRadio label {
-    color: #c8d0e8 !important; font-size: 14px !important;
-    font-weight: 600 !important; padding: 10px 6px !important;
-}
-section[data-testid="stSidebar"] .stRadio label:hover { color: #ffffff !important; }
-section[data-testid="stSidebar"] hr { border-color: rgba(255,255,255,0.12) !important; }
-section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] p,
-section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] div { color: #c8d0e8; }
-.app-header {
-    background: linear-gradient(135deg, #ffffff 0%, #fff5f5 60%, #fffbf0 100%);
-    border-bottom: 3px solid #c8102e;
-    border-radius: 0 0 20px 20px;
-    padding: 28px 40px 22px;
-    margin: -1rem -1rem 2rem -1rem;
-    position: relative; overflow: hidden;
-    box-shadow: 0 4px 24px rgba(200,16,46,0.08);
-}
-.app-header::before {
-    content: ''; position: absolute; top: 0; left: 0; right: 0; height: 4px;
-    background: linear-gradient(90deg, #8b0000 0%, #c8102e 40%, #d4af37 70%, #c8102e 100%);
-}
-.header-sinhala { font-family: 'Noto Sans Sinhala', sans-serif; font-size: 26px; font-weight: 800; color: #1e2340; line-height: 1.4; }
-.header-english { font-family: 'Plus Jakarta Sans', sans-serif; font-size: 13px; font-weight: 600; color: #c8102e; letter-spacing: 0.08em; text-transform: uppercase; margin-top: 4px; }
-.header-flag { font-size: 52px; margin-right: 20px; vertical-align: middle; }
-.header-icon { font-size: 36px; margin-right: 14px; vertical-align: middle; }
-.card {
-    background: #ffffff; border: 1px solid #e2e6f0;
-    border-left: 4px solid #c8102e; border-radius: 14px;
-    padding: 20px; margin-bottom: 16px;
-    transition: transform .2s, box-shadow .25s;
-}
-.card:hover { transform: translateY(-3px); box-shadow: 0 8px 32px rgba(200,16,46,0.10); border-left-color: #d4af37; }
-.circ-table { width:100%; border-collapse:collapse; font-size:13px; }
-.circ-table thead tr { background: #8b0000; color: #fff; }
-.circ-table thead th { padding: 10px 12px; text-align: left; font-weight: 700; font-size: 12px; letter-spacing: 0.06em; text-transform: uppercase; white-space: nowrap; }
-.circ-table tbody tr { border-bottom: 1px solid #e8eaf0; transition: background .15s; }
-.circ-table tbody tr:hover { background: #fff5f5; }
-.circ-table tbody td { padding: 9px 12px; vertical-align: middle; color: #374060; line-height: 1.4; }
-.circ-table tbody td:first-child { font-weight: 700; color: #c8102e; white-space: nowrap; }
-.circ-table tbody td.date-col { white-space: nowrap; color: #8a90a8; font-size: 12px; }
-.circ-table tbody td.topic-col { max-width: 340px; }
-.circ-table .dl-btn { display:inline-block; background: #c8102e; color: #fff !important; border-radius: 6px; padding: 4px 10px; font-size: 11px; font-weight: 700; text-decoration: none; white-space: nowrap; }
-.circ-table .dl-btn:hover { background: #a50d26; }
-.circ-table-wrap { background: #fff; border: 1px solid #e2e6f0; border-radius: 12px; overflow: hidden; margin-bottom: 16px; }
-.answer-box { background: #ffffff; border: 1px solid #e2e6f0; border-left: 4px solid #c8102e; border-radius: 4px 16px 16px 16px; padding: 22px 26px; margin: 14px 0; line-height: 1.85; font-size: 15px; color: #1e2340; box-shadow: 0 2px 12px rgba(0,0,0,0.06); }
-.user-box { background: linear-gradient(135deg, #c8102e, #a50d26); border-radius: 16px 16px 4px 16px; padding: 16px 22px; margin: 14px 0 14px 15%; color: #fff; font-weight: 600; font-size: 15px; box-shadow: 0 4px 16px rgba(200,16,46,0.30); }
-.b-en  { background: #e8f0ff; color: #1d4ed8; border: 1px solid #bfcfff; border-radius: 20px; padding: 4px 14px; font-size: 12px; font-weight: 700; }
-.b-si  { background: #fff8e0; color: #92620a; border: 1px solid #f0d080; border-radius: 20px; padding: 4px 14px; font-size: 12px; font-weight: 700; font-family: 'Noto Sans Sinhala', sans-serif; }
-.b-num { background: #fff0f2; color: #c8102e; border: 1px solid #f0c0c8; border-radius: 20px; padding: 4px 14px; font-size: 12px; font-weight: 700; }
-.b-dl  { background: #fff4e8; color: #c2600a; border: 1px solid #f0c890; border-radius: 20px; padding: 4px 12px; font-size: 12px; font-weight: 600; }
-.met { background: #ffffff; border: 1px solid #e2e6f0; border-top: 4px solid; border-radius: 16px; padding: 28px 18px 22px; text-align: center; transition: transform .2s, box-shadow .2s; box-shadow: 0 2px 12px rgba(0,0,0,0.05); }
-.met:hover { transform: translateY(-4px); box-shadow: 0 12px 32px rgba(0,0,0,0.10); }
-.met-val { font-size: 3rem; font-weight: 800; font-family: 'Lora', serif; line-height: 1.1; }
-.met-lbl { color: #7a80a0; font-size: 12px; margin-top: 10px; letter-spacing: 0.12em; text-transform: uppercase; font-weight: 600; }
-.stButton > button { background: #ffffff !important; color: #374060 !important; border: 1.5px solid #d0d5e8 !important; border-radius: 10px !important; font-family: 'Plus Jakarta Sans', sans-serif !important; font-size: 14px !important; font-weight: 600 !important; transition: all .2s !important; padding: 8px 16px !important; }
-.stButton > button:hover { border-color: #c8102e !important; color: #c8102e !important; background: #fff5f5 !important; }
-button[data-testid="baseButton-primary"], .stFormSubmitButton > button { background: linear-gradient(135deg, #c8102e, #a50d26) !important; color: #fff !important; border: none !important; font-weight: 700 !important; }
-.stTextInput > div > div > input { background: #ffffff !important; border: 2px solid #d8dcea !important; border-radius: 10px !important; color: #1e2340 !important; font-size: 15px !important; padding: 10px 14px !important; }
-.stTextInput > div > div > input:focus { border-color: #c8102e !important; box-shadow: 0 0 0 3px rgba(200,16,46,0.10) !important; }
-.stSelectbox > div > div { background: #ffffff !important; border: 2px solid #d8dcea !important; border-radius: 10px !important; color: #1e2340 !important; font-size: 15px !important; }
-h1 { font-family: 'Lora', serif !important; color: #1e2340 !important; font-size: 2rem !important; }
-h2 { color: #1e2340 !important; font-size: 1.4rem !important; font-weight: 700 !important; }
-h3 { color: #374060 !important; font-size: 1.1rem !important; font-weight: 600 !important; }
-.sidebar-brand-si { font-family: 'Noto Sans Sinhala', sans-serif; font-size: 14px; font-weight: 800; color: #ffffff; line-height: 1.7; text-align: center; }
-.sidebar-brand-en { font-family: 'Plus Jakarta Sans', sans-serif; font-size: 10px; color: #f0a0b0; text-transform: uppercase; letter-spacing: 1.2px; font-weight: 700; text-align: center; margin-top: 5px; }
-.status-pill { background: rgba(255,255,255,0.08); border: 1px solid rgba(255,255,255,0.14); border-radius: 10px; padding: 8px 12px; margin-bottom: 7px; font-size: 13px; color: #c8d0e8; font-weight: 500; }
-::-webkit-scrollbar { width: 6px; }
-::-webkit-scrollbar-track { background: #f0f2f8; }
-::-webkit-scrollbar-thumb { background: #c8d0e8; border-radius: 10px; }
-footer, #MainMenu { visibility: hidden; }
-</style>
-""", unsafe_allow_html=True)
+# Lives in assets/app.css; read and collapsed to one line once at import —
+# less for the markdown parser on every rerun
+_CSS = "<style>" + "".join(
+    line.strip() for line in (Path(__file__).parent / "assets" / "app.css").read_text(encoding="utf-8").splitlines()
+) + "</style>"
+
+HEADER_HTML = """
+    <div class='app-header'>
+        <span class='header-flag'>{flag}</span>{icon}
+        <div style='display:inline-block;vertical-align:middle'>
+            <div class='header-sinhala'>{title_si}</div>{extra}
+            <div class='header-english'>{title_en}</div>
+        </div>
+    </div>"""
+
+
+DEADLINE_CARD_HTML = """
+    <div class="card" style='display:flex;justify-content:space-between;align-items:center'>
+        <div>
+            <span class="b-num">{number}</span>&nbsp;{badge}&nbsp;
+            <span style='color:#374060;font-size:14px;font-weight:500'>{topic}</span>
+        </div>
+        <span class="b-dl" style='white-space:nowrap'>⚠️ {deadline}</span>
+    </div>"""
+
+
+YEAR_BAR_HTML = """
+    <div style='margin-bottom:14px'>
+        <div style='display:flex;justify-content:space-between;font-size:14px;font-weight:500'>
+            <span>{label}</span><span style='color:#c8102e;font-weight:700'>{cnt}</span>
+        </div>
+        <div style='background:#e8eaf0;border-radius:6px;height:10px;margin-top:6px'>
+            <div style='background:linear-gradient(90deg,#c8102e,#d4af37);width:{pct}%;height:10px;border-radius:6px'></div>
+        </div>
+    </div>"""
+
+HOME_YEAR_BAR_HTML = """
+    <div style='margin-bottom:12px'>
+        <div style='display:flex;justify-content:space-between;font-size:14px;font-weight:500'>
+            <span style='color:#1e2340'>{label}</span>
+            <span style='color:#c8102e;font-weight:700'>{cnt}</span>
+        </div>
+        <div style='background:#e8eaf0;border-radius:6px;height:10px;margin-top:5px'>
+            <div style='background:linear-gradient(90deg,#c8102e,#d4af37);width:{pct}%;height:10px;border-radius:6px'></div>
+        </div>
+    </div>"""
+
+RECENT_ROW_HTML = """
+    <div style='display:flex;justify-content:space-between;align-items:center;
+                padding:6px 0;border-bottom:1px solid #f0f2f8;font-size:13px'>
+        <div><span style='color:#c8102e;font-weight:700'>{number}</span>
+        &nbsp;{badge}&nbsp;<span style='color:#374060'>{topic}</span></div>
+        <span style='color:#8a90a8;font-size:11px;white-space:nowrap'>{date}</span>
+    </div>"""
+
+HOME_DEADLINE_CARD_HTML = """
+    <div class='card'>
+        <span class='b-num'>{number}</span>&nbsp;{badge}
+        <div style='margin-top:8px;font-size:13px;color:#374060;font-weight:500'>{topic}</div>
+        <div style='margin-top:6px'><span class='b-dl'>⚠️ {deadline}</span></div>
+    </div>"""
+
+MINISTRY_BAR_HTML = """
+    <div style='margin-bottom:12px'>
+        <div style='display:flex;justify-content:space-between;font-size:13px;font-weight:500'>
+            <span>{label}</span><span style='color:#1d4ed8;font-weight:700'>{cnt}</span>
+        </div>
+        <div style='background:#e8eaf0;border-radius:6px;height:8px;margin-top:5px'>
+            <div style='background:linear-gradient(90deg,#1d4ed8,#60a5fa);width:{pct}%;height:8px;border-radius:6px'></div>
+        </div>
+    </div>"""
+
+
+def _bars_html(template: str, counts: dict, total: int) -> str:
+    """All progress bars for one chart as a single HTML string; percents in one array op."""
+    cnts = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    pcts = np.floor_divide(cnts * 100, total)
+    return "".join(template.format(label=label, cnt=c, pct=p)
+                   for label, c, p in zip(counts, cnts.tolist(), pcts.tolist()))
+
+
+def _render_header(title_si: str, title_en: str, icon: str = "", extra: str = "", flag: str = "🇱🇰"):
+    """Page banner shared by every page — one template, one st.markdown call."""
+    st.markdown(HEADER_HTML.format(
+        flag=flag, icon=f"<span class='header-icon'>{icon}</span>" if icon else "",
+        title_si=title_si, extra=extra, title_en=title_en,
+    ), unsafe_allow_html=True)
+
+
+@st.cache_resource
+def _inject_css() -> bool:
+    # Cached element calls are replayed on every rerun without rebuilding the string
+    st.markdown(_CSS, unsafe_allow_html=True)
+    return True
+
+
+_inject_css()
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+@st.cache_resource(ttl=60)
+def _pdf_index() -> dict[str, Path]:
+    """
+    downloads/ walked once: "downloads/<year>/<lang>/<file>" → path.
+    Keyed by relative path, not filename — English and Sinhala PDFs share names.
+    """
+    base_dir = Path(__file__).resolve().parent
+    index    = {}
+    for root, _, files in os.walk(base_dir / "downloads"):
+        rel = Path(root).relative_to(base_dir).as_posix()
+        for f in files:
+            index[f"{rel}/{f}"] = Path(root) / f
+    return index
+
+
 def resolve_pdf_path(pdf_path_str: str) -> Path | None:
     if not pdf_path_str:
         return None
+    return (_pdf_index().get(pdf_path_str.replace("\\", "/"))
+            or _resolve_pdf_path_slow(pdf_path_str))
+
+
+@st.cache_resource
+def _slow_pdf_hits() -> dict[str, Path]:
+    """
+    Fallback lookups that found a PDF, shared across reruns. Misses aren't kept:
+    they are re-checked next time, in case the file has been downloaded since.
+    """
+    return {}
+
+
+def _resolve_pdf_path_slow(pdf_path_str: str) -> Path | None:
+    hits = _slow_pdf_hits()
+    if pdf_path_str in hits:
+        return hits[pdf_path_str]
     base_dir = Path(__file__).resolve().parent
     fname = Path(pdf_path_str).name
     for p in [
@@ -138,54 +200,348 @@ def resolve_pdf_path(pdf_path_str: str) -> Path | None:
     ]:
         try:
             if p.exists():
+                hits[pdf_path_str] = p
                 return p
         except Exception:
             pass
     return None
 
 
-@st.cache_data(ttl=300)
-def load_all_circulars() -> list[dict]:
+@st.cache_resource(max_entries=32)
+def _pdf_bytes(path: str) -> bytes:
+    """PDF contents for download buttons. Passed as partial(_pdf_bytes, path) so it only runs on click."""
+    return Path(path).read_bytes()
+
+
+@st.cache_data(ttl=5)
+def _paths_status() -> dict:
+    """DB / vector-store presence for the sidebar and page guards — one stat each per 5 s."""
+    return {"db": Path(DB_FILE).exists(), "vec": Path(CHROMA_DIR).exists()}
+
+
+@st.cache_resource(max_entries=1)
+def _conn(sig: int) -> sqlite3.Connection:
+    """
+    One read connection per DB version, tuned once. Shared across sessions/threads.
+    Keyed on the DB signature: a pulled circulars.db is a new file renamed over the
+    old one, and a connection opened before that would keep reading the old file.
+    """
+    conn = open_ro(DB_FILE, check_same_thread=False)   # never writes the git-tracked file
+    conn.executescript("""
+        PRAGMA cache_size  = -32768;
+        PRAGMA temp_store  = MEMORY;
+    """)
+    return conn
+
+
+def _db_mtime() -> int:
+    """
+    Cache key for everything loaded from the DB: changes only when the pipeline writes it,
+    so loaders stay warm indefinitely instead of re-reading on a timer.
+    """
+    try:
+        return os.stat(DB_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@st.cache_data(max_entries=2)
+def load_stats(sig: int) -> dict:
+    """Corpus counts for the sidebar / Home metrics — one GROUP BY instead of N Python passes."""
+    stats = {"total": 0, "si": 0, "en": 0, "yr25": 0, "yr26": 0, "deadlines": 0, "by_year": Counter(), "top_years": []}
     if not Path(DB_FILE).exists():
-        return []
-    conn = sqlite3.connect(DB_FILE)
-    rows = conn.execute("""
-        SELECT circular_number, issued_date, issued_by,
-               topic, summary, key_instructions,
-               applies_to, deadline, language, pdf_path
+        return stats
+    rows = _conn(sig).execute("""
+        SELECT language, CAST(strftime('%Y', substr(issued_date, 1, 10)) AS INTEGER), COUNT(*),
+               SUM(deadline IS NOT NULL AND deadline NOT IN ('null', 'None', ''))
         FROM   circulars
         WHERE  summary IS NOT NULL
-        ORDER BY
-            CASE language WHEN 'S' THEN 0 ELSE 1 END,
-            issued_date DESC
+        GROUP BY 1, 2
     """).fetchall()
-    conn.close()
-    out = []
-    for r in rows:
-        try:
-            ki = json.loads(r[5]) if r[5] else []
-            if isinstance(ki, str):
-                ki = [ki]
-        except Exception:
-            ki = []
-        out.append({
-            "circular_number" : (r[0] or "").strip(),
-            "issued_date"     : r[1] or "",
-            "issued_by"       : r[2] or "",
-            "topic"           : r[3] or "",
-            "summary"         : r[4] or "",
-            "key_instructions": ki,
-            "applies_to"      : r[6] or "",
-            "deadline"        : r[7] or "",
-            "language"        : r[8] or "S",
-            "pdf_path"        : r[9] or "",
-        })
-    return out
+    for lang, yr, cnt, dls in rows:
+        stats["total"]     += cnt
+        stats["deadlines"] += dls
+        stats["by_year"][yr] += cnt   # integer year; None when the date doesn't parse
+        if lang == "E":
+            stats["en"] += cnt
+        else:
+            stats["si"] += cnt
+    stats["yr25"] = stats["by_year"][2025]
+    stats["yr26"] = stats["by_year"][2026]
+    # Home's year bars — rolled up and sorted here, once per cache fill, not per rerun.
+    # Undated bucket first, then newest year first; labels match the Dashboard's.
+    stats["top_years"] = [(str(yr) if yr else "unkn", n) for yr, n in
+                          sorted(stats["by_year"].items(), key=lambda kv: kv[0] or 9999, reverse=True)[:5]]
+    return stats
+
+
+@dataclass(slots=True, frozen=True)
+class Circ:
+    """One summarised circular. Frozen — instances are shared across sessions."""
+    circular_number : str
+    issued_date     : str
+    issued_by       : str
+    topic           : str
+    summary         : str
+    applies_to      : str
+    deadline        : str
+    language        : str
+    pdf_path        : str
+    has_deadline    : bool   # deadline is a real value, not "", "null" or "None"
+
+
+_CIRCULARS_SQL = """
+    SELECT circular_number, issued_date, issued_by,
+           topic, summary,
+           applies_to, deadline, language, pdf_path
+    FROM   circulars
+    WHERE  summary IS NOT NULL
+    ORDER BY
+        CASE language WHEN 'S' THEN 0 ELSE 1 END,
+        issued_date DESC
+"""
+
+
+# cache_resource hands back the same list object (no pickle/unpickle per rerun).
+# It is shared across sessions — callers must treat it as read-only.
+@st.cache_resource(max_entries=2)
+def load_all_circulars(sig: int) -> list[Circ]:
+    """Circ objects for the Home / Q&A paths, built from the columns load_df() already parsed."""
+    df = load_df(sig)
+    if df.empty:
+        return []
+    cols = df[list(Circ.__dataclass_fields__)]
+    return [Circ(*row) for row in cols.itertuples(index=False, name=None)]
+
+
+@st.cache_resource(max_entries=2)
+def load_highlights(sig: int) -> dict:
+    """
+    Subsets shown on Home / Dashboard, derived once per data load.
+    Rows already arrive Sinhala-first and newest-first, so "recent" is a slice.
+    """
+    circulars = load_all_circulars(sig)
+    return {
+        # islice stops after RECENT_N hits — no full filtered list, no sort (SQL already ordered)
+        "recent_si": list(islice((c for c in circulars if c.language == "S" and c.issued_date), RECENT_N)),
+        "recent_en": list(islice((c for c in circulars if c.language == "E" and c.issued_date), RECENT_N)),
+        "deadlines": [c for c in circulars if c.has_deadline],
+    }
+
+
+def _truncate(col, n: int, ellipsis: str = "..."):
+    """Vectorised `s[:n] + ellipsis if len(s) > n` over a string column."""
+    return col.str.slice(0, n).where(col.str.len() <= n, col.str.slice(0, n) + ellipsis)
+
+
+@st.cache_resource(max_entries=2)
+def load_df(sig: int):
+    """
+    Column-wise view of the circulars for vectorised counting / filtering (read-only, shared).
+    Row i is load_all_circulars()[i], so a boolean mask maps straight back to Circ objects.
+    """
+    if not Path(DB_FILE).exists():
+        return pd.DataFrame()
+    df = pd.read_sql_query(_CIRCULARS_SQL, _conn(sig))
+    if not df.empty:
+        df = df.fillna("")
+        df["circular_number"] = df["circular_number"].str.strip()
+        df["language"]        = df["language"].replace("", "S")
+        df["has_deadline"]    = ~df["deadline"].isin(_NULL_DEADLINE)
+        # Parsed once; the year label comes from the date, not from slicing the raw text
+        df["issued_dt"] = pd.to_datetime(df["issued_date"].str[:10], format="%Y-%m-%d", errors="coerce")
+        df["year_i"]    = df["issued_dt"].dt.year.astype("Int16")   # nullable, 2 bytes per row
+        df["year"]      = df["year_i"].astype("string").fillna("unknown").str[:4]
+        # One lowered haystack per row; \x1f keeps a query from matching across two fields
+        df["search_l"] = (df["topic"] + "\x1f" + df["circular_number"] + "\x1f" +
+                          df["summary"] + "\x1f" + df["applies_to"]).str.lower()
+        df["language"] = df["language"].astype("category")   # two distinct values
+        df["is_si"] = df["language"] == "S"
+        df["is_en"] = df["language"] == "E"
+        # Display truncations done once here instead of per row on every rerun
+        df["topic70"]    = _truncate(df["topic"], 70)
+        df["summary100"] = _truncate(df["summary"], 100)
+        df["topic65"]    = _truncate(df["topic"], 65, "…")
+    return df
+
+
+@st.cache_data(max_entries=256)
+def _browse_rows(q: str, lf: str, dl_only: bool, sig: int) -> np.ndarray:
+    """
+    Row positions in load_df(sig) matching the Browse filters. Cached per filter state, so
+    retyping a search is a lookup; sig (hashed, not _-prefixed) ties entries to the data.
+    """
+    df = load_df(sig)
+    # Cheap boolean masks first; the substring scan only visits the rows they keep
+    mask = np.ones(len(df), dtype=bool)
+    if lf == "සිංහල":
+        mask &= df["is_si"].to_numpy()
+    elif lf == "English":
+        mask &= df["is_en"].to_numpy()
+    if dl_only:
+        mask &= df["has_deadline"].to_numpy()
+    if q:
+        keep = np.flatnonzero(mask)
+        mask[keep] = df["search_l"].iloc[keep].str.contains(q.lower(), regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@dataclass(slots=True, frozen=True)
+class CircSummary:
+    """Corpus aggregates plus the DataFrame they came from — built once, shared by Browse / Dashboard."""
+    total   : int
+    si      : int
+    en      : int
+    dls     : int
+    yr25    : int
+    yr26    : int
+    year_cnt: dict
+    min_cnt : dict
+    df      : pd.DataFrame
+
+
+@st.cache_resource(max_entries=2)
+def load_summary(sig: int) -> CircSummary:
+    """Aggregates counted once per data load from the cached DataFrame."""
+    df = load_df(sig)
+    if df.empty:
+        return CircSummary(0, 0, 0, 0, 0, 0, {}, {}, df)
+    lang_cnt = df["language"].value_counts()
+    year_cnt = df["year"].value_counts()
+    min_cnt  = df["issued_by"].replace("", "Unknown").str[:40].value_counts()
+    return CircSummary(
+        total    = len(df),
+        si       = int(lang_cnt.get("S", 0)),
+        en       = int(lang_cnt.get("E", 0)),
+        dls      = int(df["has_deadline"].sum()),
+        yr25     = int((df["year_i"] == 2025).sum()),
+        yr26     = int((df["year_i"] == 2026).sum()),
+        year_cnt = {yr: int(n) for yr, n in sorted(year_cnt.items(), reverse=True)},
+        min_cnt  = {m: int(n) for m, n in min_cnt.head(6).items()},
+        df       = df,
+    )
+
+
+def render_pdf_request() -> bool:
+    """
+    Serve a Browse ?pdf=downloads/... link, which opens in its own tab. Only paths in
+    the downloads/ index are accepted, and the file is read here — not while the table
+    is being built. Returns True when the run was a PDF request (nothing else to render).
+    """
+    rel = st.query_params.get("pdf")
+    if not rel:
+        return False
+    path = _pdf_index().get(rel)
+    if path is None:
+        st.warning(f"PDF not found: {rel}")
+        return True
+    c1, c2, c3 = st.columns([4, 1, 1])
+    c1.info(f"📄 {path.name}")
+    c2.download_button("📥 Download", data=partial(_pdf_bytes, str(path)),
+                       file_name=path.name, mime="application/pdf",
+                       key="qp_dl", width="stretch")
+    if c3.button("✖ Close", key="qp_close", width="stretch"):
+        del st.query_params["pdf"]
+        st.rerun()
+    return True
+
+
+@st.cache_resource(show_spinner="🧠 Loading embedding model …")
+def _qa_collection():
+    """Embedding model + Chroma collection, loaded once per process and shared by every session."""
+    return open_collection()
+
+
+def render_store_warning(history: list):
+    """Flag vectors that don't match the query model — checked only once a question has loaded them."""
+    if history and (warning := store_mismatch(_qa_collection())):
+        st.warning(f"⚠️ {warning}")
+
+
+def clear_data_caches():
+    """Drop every cached load so the next run re-reads circulars.db and downloads/."""
+    for fn in (load_all_circulars, load_highlights, load_df, load_summary, _browse_rows,
+               load_stats, _conn, _pdf_index, _paths_status, _slow_pdf_hits):
+        fn.clear()
+
+
+def _sources_html(sources: list) -> str:
+    """Source rows as one HTML table string (no Streamlit calls)."""
+    rows = []
+    for s in sources:
+        badge    = '<span class="b-si">සිං</span>' if s["language"] == "S" else '<span class="b-en">EN</span>'
+        dl_badge = f'&nbsp;<span class="b-dl">⚠️ {s["deadline"]}</span>' if (s.get("deadline") or "") not in _NULL_DEADLINE else ""
+        rows.append(f"""<tr>
+<td>{s['circular_number']}<br><small>{badge}{dl_badge}</small></td>
+<td class="date-col">{s['issued_date'] or '—'}</td>
+<td style="color:#059669;font-weight:700">{s['relevance_score']}%</td>
+<td class="topic-col">{s['topic'][:75]}</td>
+</tr>""")
+    return f"""<table class="circ-table">
+<thead><tr><th>Circular #</th><th>Date</th><th>Match</th><th>Topic</th></tr></thead>
+<tbody>{"".join(rows)}</tbody></table>"""
+
+
+def render_sources(sources: list, key_prefix: str, html: str | None = None):
+    """Source table as one markdown (html if pre-rendered); only the PDF downloads are widgets, in a single row."""
+    st.markdown(html or _sources_html(sources), unsafe_allow_html=True)
+
+    pdfs = [(i, s, p) for i, s in enumerate(sources) if (p := resolve_pdf_path(s.get("pdf_path", "")))]
+    if pdfs:
+        for col, (i, s, pdf_full) in zip(st.columns(len(pdfs)), pdfs):
+            safe_num = s["circular_number"].replace("/","_").replace(" ","_")
+            col.download_button(f"📥 {s['circular_number']}", data=partial(_pdf_bytes, str(pdf_full)),
+                                file_name=pdf_full.name, mime="application/pdf",
+                                key=f"{key_prefix}_{i}_{safe_num}",
+                                width="stretch")
+
+
+@st.fragment
+def render_turn(turn: dict, key_prefix: str):
+    """One Q&A exchange. Its download buttons rerun only this fragment, not the whole history."""
+    # HTML is built on first render and kept on the turn dict (it lives in session_state),
+    # so later reruns re-emit two cached strings instead of re-formatting every source row
+    if "_html" not in turn:
+        turn["_html"] = (f'<div class="user-box">🙋 {turn["question"]}</div>'
+                         f'<div class="answer-box">🤖&nbsp; {turn["answer"]}</div>')
+        turn["_sources_html"] = _sources_html(turn.get("sources") or [])
+    st.markdown(turn["_html"], unsafe_allow_html=True)
+    if turn.get("sources"):
+        with st.expander(f"📎 {len(turn['sources'])} sources"):
+            render_sources(turn["sources"], key_prefix=key_prefix, html=turn["_sources_html"])
+
+
+@st.fragment
+def render_qa_settings():
+    """Q&A language / k controls. Changing one reruns just this fragment, not the chat history."""
+    c_lang, c_k = st.columns(2)
+    with c_lang:
+        # ── Default to Sinhala ──
+        st.selectbox("Language", list(QA_LANGS), key="qa_lang",
+                     help="සිංහල = Sinhala circulars only")
+    with c_k:
+        st.slider("Sources (k)", 3, 10, 5, key="qa_k")
+
+
+@st.fragment
+def render_suggestions(key_prefix: str, ask):
+    """SUGGESTIONS as one st.pills widget; ask(question) runs the query and triggers a full rerun."""
+    pending = f"{key_prefix}_pending"
+
+    def pick():
+        # Hand the choice over and reset the pills, so a cleared chat doesn't re-ask it
+        st.session_state[pending]    = st.session_state[key_prefix]
+        st.session_state[key_prefix] = None
+
+    st.pills("Suggested questions", SUGGESTIONS, key=key_prefix,
+             on_change=pick, label_visibility="collapsed")
+    if sug := st.session_state.pop(pending, None):
+        ask(sug)
 
 
 # ── Sidebar ───────────────────────────────────────────────────────────────────
 
-def render_sidebar(circulars):
+def render_sidebar(stats: dict):
     st.sidebar.markdown("""
     <div style='text-align:center;padding:24px 12px 16px'>
         <div style='font-size:48px;margin-bottom:10px'>🇱🇰</div>
@@ -202,12 +558,13 @@ def render_sidebar(circulars):
     st.sidebar.divider()
 
     api_key = os.environ.get("GROQ_API_KEY", "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")
-    db_ok   = Path(DB_FILE).exists()
-    vec_ok  = Path(CHROMA_DIR).exists()
+    paths   = _paths_status()
+    db_ok   = paths["db"]
+    vec_ok  = paths["vec"]
     key_ok  = bool(api_key)
-    n       = len(circulars)
-    si      = sum(1 for c in circulars if c["language"] == "S")
-    en      = sum(1 for c in circulars if c["language"] == "E")
+    n       = stats["total"]
+    si      = stats["si"]
+    en      = stats["en"]
 
     # ── Sinhala shown first in sidebar corpus counts ──
     st.sidebar.markdown(f"""
@@ -227,6 +584,10 @@ def render_sidebar(circulars):
     </div>
 </div>
 """, unsafe_allow_html=True)
+    st.sidebar.write("")
+    if st.sidebar.button("🔄 Refresh data", key="sidebar_refresh", width="stretch"):
+        clear_data_caches()
+        st.rerun()
     return page, api_key
 
 
@@ -246,35 +607,28 @@ SUGGESTIONS = [
 ]
 
 
-def page_home(circulars: list, api_key: str):
-    st.markdown("""
-    <div class='app-header'>
-        <span class='header-flag'>🇱🇰</span><span class='header-icon'>🏠</span>
-        <div style='display:inline-block;vertical-align:middle'>
-            <div class='header-sinhala'>ශ්‍රී ලංකා රජයේ චක්‍රලේඛ නිරීක්ෂණ පද්ධතිය</div>
-            <div class='header-english'>Sri Lanka Government Circulars Monitor · Home</div>
-        </div>
-    </div>""", unsafe_allow_html=True)
+def page_home(highlights: dict, stats: dict, api_key: str):
+    _render_header(
+        icon="🏠",
+        title_si="ශ්‍රී ලංකා රජයේ චක්‍රලේඛ නිරීක්ෂණ පද්ධතිය",
+        title_en="Sri Lanka Government Circulars Monitor · Home",
+    )
 
-    if not circulars:
+    if not stats["total"]:
         st.error(f"Database not found: {DB_FILE}")
         return
 
-    total = len(circulars)
-    si    = sum(1 for c in circulars if c["language"] == "S")
-    en    = sum(1 for c in circulars if c["language"] == "E")
-    dls   = sum(1 for c in circulars if c["deadline"] and c["deadline"] not in ("null","None",""))
-    yr25  = sum(1 for c in circulars if c["issued_date"].startswith("2025"))
-    yr26  = sum(1 for c in circulars if c["issued_date"].startswith("2026"))
+    total = stats["total"]
+    dls   = stats["deadlines"]
 
     # ── Sinhala first in metrics ──
     for col, (val, lbl, col_hex) in zip(
         st.columns(5),
-        [(total, "සමස්ත / Total",     "#c8102e"),
-         (si,    "සිංහල / Sinhala",   "#b45309"),
-         (en,    "English",            "#1d4ed8"),
-         (yr25,  "2025",               "#065f46"),
-         (yr26,  "2026",               "#7c3aed")],
+        [(total,         "සමස්ත / Total",     "#c8102e"),
+         (stats["si"],   "සිංහල / Sinhala",   "#b45309"),
+         (stats["en"],   "English",            "#1d4ed8"),
+         (stats["yr25"], "2025",               "#065f46"),
+         (stats["yr26"], "2026",               "#7c3aed")],
     ):
         col.markdown(f"""
         <div class='met' style='border-top-color:{col_hex}'>
@@ -287,55 +641,31 @@ def page_home(circulars: list, api_key: str):
 
     with col_l:
         st.subheader("By Year")
-        year_cnt = {}
-        for c in circulars:
-            y = (c["issued_date"] or "unknown")[:4]
-            year_cnt[y] = year_cnt.get(y, 0) + 1
-        for yr, cnt in sorted(year_cnt.items(), reverse=True)[:5]:
-            pct = cnt * 100 // total
-            st.markdown(f"""
-            <div style='margin-bottom:12px'>
-                <div style='display:flex;justify-content:space-between;font-size:14px;font-weight:500'>
-                    <span style='color:#1e2340'>{yr}</span>
-                    <span style='color:#c8102e;font-weight:700'>{cnt}</span>
-                </div>
-                <div style='background:#e8eaf0;border-radius:6px;height:10px;margin-top:5px'>
-                    <div style='background:linear-gradient(90deg,#c8102e,#d4af37);width:{pct}%;height:10px;border-radius:6px'></div>
-                </div>
-            </div>""", unsafe_allow_html=True)
+        st.markdown(_bars_html(HOME_YEAR_BAR_HTML, dict(stats["top_years"]), total), unsafe_allow_html=True)
 
     with col_r:
         st.subheader(" legedly Recent — සිංහල පළමු")
-        # ── Sinhala first, then English ──
-        recent_si = sorted([c for c in circulars if c["language"] == "S" and c["issued_date"]],
-                           key=lambda x: x["issued_date"], reverse=True)[:5]
-        recent_en = sorted([c for c in circulars if c["language"] == "E" and c["issued_date"]],
-                           key=lambda x: x["issued_date"], reverse=True)[:5]
-        for c in recent_si + recent_en:
-            lb = '<span class="b-si">සිං</span>' if c["language"] == "S" else '<span class="b-en">EN</span>'
-            t  = c["topic"][:45] + ("..." if len(c["topic"]) > 45 else "")
-            st.markdown(f"""
-            <div style='display:flex;justify-content:space-between;align-items:center;
-                        padding:6px 0;border-bottom:1px solid #f0f2f8;font-size:13px'>
-                <div><span style='color:#c8102e;font-weight:700'>{c["circular_number"]}</span>
-                &nbsp;{lb}&nbsp;<span style='color:#374060'>{t}</span></div>
-                <span style='color:#8a90a8;font-size:11px;white-space:nowrap'>{c["issued_date"]}</span>
-            </div>""", unsafe_allow_html=True)
-
-    dl_circulars = [c for c in circulars if c["deadline"] and c["deadline"] not in ("null","None","")]
+        # ── Sinhala first, then English ── (one markdown for the whole list)
+        st.markdown("".join(RECENT_ROW_HTML.format(
+            number=c.circular_number,
+            badge='<span class="b-si">සිං</span>' if c.language == "S" else '<span class="b-en">EN</span>',
+            topic=c.topic[:45] + ("..." if len(c.topic) > 45 else ""),
+            date=c.issued_date,
+        ) for c in highlights["recent_si"] + highlights["recent_en"]), unsafe_allow_html=True)
+
+    dl_circulars = highlights["deadlines"][:6]
     if dl_circulars:
         st.divider()
         st.subheader(f"⚠️ Upcoming Deadlines ({dls})")
         dcols = st.columns(min(3, len(dl_circulars)))
-        for i, c in enumerate(dl_circulars[:6]):
-            lb = '<span class="b-si">සිං</span>' if c["language"] == "S" else '<span class="b-en">EN</span>'
-            t  = c["topic"][:55] + ("..." if len(c["topic"]) > 55 else "")
-            dcols[i % 3].markdown(f"""
-            <div class='card'>
-                <span class='b-num'>{c["circular_number"]}</span>&nbsp;{lb}
-                <div style='margin-top:8px;font-size:13px;color:#374060;font-weight:500'>{t}</div>
-                <div style='margin-top:6px'><span class='b-dl'>⚠️ {c["deadline"]}</span></div>
-            </div>""", unsafe_allow_html=True)
+        # Cards i, i+3 share a column: one markdown per column instead of one per card
+        for j, col in enumerate(dcols):
+            col.markdown("".join(HOME_DEADLINE_CARD_HTML.format(
+                number=c.circular_number,
+                badge='<span class="b-si">සිං</span>' if c.language == "S" else '<span class="b-en">EN</span>',
+                topic=c.topic[:55] + ("..." if len(c.topic) > 55 else ""),
+                deadline=c.deadline,
+            ) for c in dl_circulars[j::3]), unsafe_allow_html=True)
 
     st.divider()
     st.markdown("""
@@ -349,16 +679,14 @@ def page_home(circulars: list, api_key: str):
         </div>
     </div>""", unsafe_allow_html=True)
 
-    if not Path(CHROMA_DIR).exists():
+    if not _paths_status()["vec"]:
         st.warning("Vector store not built yet. Go to ⚙️ Setup.")
         return
     if not api_key:
         st.warning("Groq API Key not found.")
         return
-    try:
-        from qa_chain import answer_question
-    except ImportError as e:
-        st.error(f"Missing package: {e}")
+    if answer_question is None:
+        st.error(f"Missing package: {_qa_err_msg}")
         return
 
     col_a, col_b = st.columns([3, 1])
@@ -372,42 +700,25 @@ def page_home(circulars: list, api_key: str):
     if "home_history" not in st.session_state:
         st.session_state.home_history = []
 
+    render_store_warning(st.session_state.home_history)
     for turn_idx, turn in enumerate(st.session_state.home_history):
-        st.markdown(f'<div class="user-box">🙋 {turn["question"]}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="answer-box">🤖&nbsp; {turn["answer"]}</div>', unsafe_allow_html=True)
-        if turn.get("sources"):
-            with st.expander(f"📎 {len(turn['sources'])} sources"):
-                for src_idx, s in enumerate(turn["sources"]):
-                    c1, c2, c3, c4, c5 = st.columns([1.4, 0.9, 0.7, 4, 1.3])
-                    badge = '<span class="b-si">සිං</span>' if s["language"] == "S" else '<span class="b-en">EN</span>'
-                    c1.markdown(f"<div style='padding:6px 0;font-weight:700;color:#c8102e'>{s['circular_number']}<br><small>{badge}</small></div>", unsafe_allow_html=True)
-                    c2.markdown(f"<div style='padding:6px 0;color:#8a90a8;font-size:12px'>{s['issued_date'] or '—'}</div>", unsafe_allow_html=True)
-                    c3.markdown(f"<div style='padding:6px 0;color:#059669;font-weight:700;font-size:12px'>{s['relevance_score']}%</div>", unsafe_allow_html=True)
-                    c4.markdown(f"<div style='padding:6px 0;font-size:13px'>{s['topic'][:70]}...</div>", unsafe_allow_html=True)
-                    pdf_full = resolve_pdf_path(s.get("pdf_path", ""))
-                    if pdf_full:
-                        safe_num = s["circular_number"].replace("/","_").replace(" ","_")
-                        with open(pdf_full, "rb") as fh:
-                            c5.download_button("📥 PDF", data=fh.read(), file_name=pdf_full.name,
-                                               mime="application/pdf",
-                                               key=f"home_dl_{turn_idx}_{src_idx}_{safe_num}",
-                                               use_container_width=True)
-                    else:
-                        c5.markdown("<div style='padding:6px 0;color:#ccc'>—</div>", unsafe_allow_html=True)
+        render_turn(turn, key_prefix=f"home_dl_{turn_idx}")
 
     if not st.session_state.home_history:
         st.markdown("**💡 යෝජිත ප්‍රශ්න / Suggested questions:**")
-        scols = st.columns(4)
-        for i, sug in enumerate(SUGGESTIONS):
-            if scols[i % 4].button(sug, key=f"home_s{i}", use_container_width=True):
-                with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
-                    try:
-                        res = answer_question(question=sug, api_key=api_key,
-                                              lang_filter=lang_filter, n_results=k)
-                        st.session_state.home_history.append(res)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+
+        def ask(sug):
+            with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
+                try:
+                    res = answer_question(question=sug, api_key=api_key,
+                                          lang_filter=lang_filter, n_results=k,
+                                          collection=_qa_collection())
+                    st.session_state.home_history.append(res)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+        render_suggestions("home_s", ask)
 
     with st.form("home_q_form", clear_on_submit=True):
         q = st.text_input("question", placeholder="ප්‍රශ්නය මෙහි ටයිප් කරන්න / Ask about any circular...", label_visibility="collapsed")
@@ -417,7 +728,8 @@ def page_home(circulars: list, api_key: str):
         with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
             try:
                 res = answer_question(question=q, api_key=api_key,
-                                      lang_filter=lang_filter, n_results=k)
+                                      lang_filter=lang_filter, n_results=k,
+                                      collection=_qa_collection())
                 st.session_state.home_history.append(res)
                 st.rerun()
             except Exception as e:
@@ -436,89 +748,59 @@ def page_home(circulars: list, api_key: str):
 # ══════════════════════════════════════════════════════════════════════════════
 
 def page_qa(api_key: str):
-    st.markdown("""
-    <div class='app-header'>
-        <span class='header-flag'>🇱🇰</span><span class='header-icon'>🤖</span>
-        <div style='display:inline-block;vertical-align:middle'>
-            <div class='header-sinhala'>AI ඒජන්තවරයාගෙන් අසන්න</div>
+    _render_header(
+        icon="🤖",
+        title_si="AI ඒජන්තවරයාගෙන් අසන්න",
+        extra="""
             <div style='font-family:"Noto Sans Sinhala",sans-serif;font-size:15px;color:#c8102e;margin-top:4px'>
                 ඔබට සිංහල භාෂාවෙන් AI ඒජන්තවරයෙකුගෙන් ප්‍රශ්න ඇසිය හැක
-            </div>
-            <div class='header-english'>ChromaDB + LangChain + Groq llama-3.1-8b</div>
-        </div>
-    </div>""", unsafe_allow_html=True)
+            </div>""",
+        title_en="ChromaDB + LangChain + Groq llama-3.1-8b",
+    )
 
-    if not Path(CHROMA_DIR).exists():
+    if not _paths_status()["vec"]:
         st.error("⚠️ Vector store not found. Go to **⚙️ Setup** and click **Build Vector Store**.")
         return
     if not api_key:
         st.warning("⚠️ Groq API Key not found.")
         return
-    try:
-        from qa_chain import answer_question
-    except ImportError as e:
-        st.error(f"Missing package: {e}")
+    if answer_question is None:
+        st.error(f"Missing package: {_qa_err_msg}")
         return
 
-    col1, col2, col3 = st.columns([4, 1, 1])
-    with col2:
-        # ── Default to Sinhala ──
-        lang_sel = st.selectbox("Language",
-                                ["සිංහල", "Both", "English only"],
-                                help="සිංහල = Sinhala circulars only")
-        lang_map    = {"සිංහල": "S", "Both": None, "English only": "E"}
-        lang_filter = lang_map[lang_sel]
-    with col3:
-        k = st.slider("Sources (k)", 3, 10, 5)
+    _, settings_col = st.columns([4, 2])
+    with settings_col:
+        render_qa_settings()
+
+    def run_query(question: str) -> dict:
+        # Settings are read at call time: a settings-only fragment rerun doesn't refresh page locals
+        lang_filter = QA_LANGS[st.session_state.qa_lang]
+        return answer_question(question=question, api_key=api_key,
+                               lang_filter=lang_filter, n_results=st.session_state.qa_k,
+                               collection=_qa_collection())
 
     if "history" not in st.session_state:
         st.session_state.history = []
 
+    render_store_warning(st.session_state.history)
     for turn_idx, turn in enumerate(st.session_state.history):
-        st.markdown(f'<div class="user-box">🙋 {turn["question"]}</div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="answer-box">🤖&nbsp; {turn["answer"]}</div>', unsafe_allow_html=True)
-        if turn.get("sources"):
-            with st.expander(f"📎 {len(turn['sources'])} sources", expanded=False):
-                for src_idx, s in enumerate(turn["sources"]):
-                    badge = '<span class="b-si">සිං</span>' if s["language"] == "S" else '<span class="b-en">EN</span>'
-                    dl_badge = f'&nbsp;<span class="b-dl">⚠️ {s["deadline"]}</span>' if s.get("deadline") and s["deadline"] not in ("null","None","") else ""
-                    bg = "#fff" if src_idx % 2 == 0 else "#fafafa"
-                    c1, c2, c3, c4, c5 = st.columns([1.4, 0.9, 0.7, 4, 1.3])
-                    with c1:
-                        st.markdown(f"<div style='padding:8px 4px;background:{bg};font-weight:700;color:#c8102e;font-size:13px'>{s['circular_number']}<br><small>{badge}{dl_badge}</small></div>", unsafe_allow_html=True)
-                    with c2:
-                        st.markdown(f"<div style='padding:8px 4px;background:{bg};color:#8a90a8;font-size:12px'>{s['issued_date'] or '—'}</div>", unsafe_allow_html=True)
-                    with c3:
-                        st.markdown(f"<div style='padding:8px 4px;background:{bg};color:#059669;font-weight:700;font-size:12px'>{s['relevance_score']}%</div>", unsafe_allow_html=True)
-                    with c4:
-                        st.markdown(f"<div style='padding:8px 4px;background:{bg};font-size:13px;color:#374060'>{s['topic'][:75]}</div>", unsafe_allow_html=True)
-                    with c5:
-                        pdf_full = resolve_pdf_path(s.get("pdf_path", ""))
-                        if pdf_full:
-                            safe_num = s['circular_number'].replace("/","_").replace(" ","_")
-                            with open(pdf_full, "rb") as f:
-                                st.download_button("📥 PDF", data=f.read(), file_name=pdf_full.name,
-                                                   mime="application/pdf",
-                                                   key=f"dl_{turn_idx}_{src_idx}_{safe_num}",
-                                                   use_container_width=True)
-                        else:
-                            st.markdown(f"<div style='padding:8px 4px;background:{bg};color:#ccc;font-size:12px'>—</div>", unsafe_allow_html=True)
+        render_turn(turn, key_prefix=f"dl_{turn_idx}")
 
     st.divider()
 
     if not st.session_state.history:
         st.markdown("**💡 යෝජිත ප්‍රශ්න / Suggested:**")
-        cols = st.columns(4)
-        for i, s in enumerate(SUGGESTIONS):
-            if cols[i % 4].button(s, key=f"s{i}", use_container_width=True):
-                with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
-                    try:
-                        res = answer_question(question=s, api_key=api_key,
-                                              lang_filter=lang_filter, n_results=k)
-                        st.session_state.history.append(res)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ {e}")
+
+        def ask(s):
+            with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
+                try:
+                    res = run_query(s)
+                    st.session_state.history.append(res)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+        render_suggestions("s", ask)
 
     with st.form("q_form", clear_on_submit=True):
         q = st.text_input("question",
@@ -529,8 +811,7 @@ def page_qa(api_key: str):
     if submitted and q.strip():
         with st.spinner("🔍 Searching …  🤖 Asking Groq …"):
             try:
-                res = answer_question(question=q, api_key=api_key,
-                                      lang_filter=lang_filter, n_results=k)
+                res = run_query(q)
                 st.session_state.history.append(res)
                 st.rerun()
             except Exception as e:
@@ -548,17 +829,15 @@ def page_qa(api_key: str):
 # PAGE 2 — Browse  (Sinhala first by default)
 # ══════════════════════════════════════════════════════════════════════════════
 
-def page_browse(circulars: list):
-    st.markdown("""
-    <div class='app-header'>
-        <span class='header-flag'>🇱🇰</span><span class='header-icon'>📋</span>
-        <div style='display:inline-block;vertical-align:middle'>
-            <div class='header-sinhala'>සියලු චක්‍රලේඛ · Browse</div>
-            <div class='header-english'>Search &amp; Filter All Government Circulars</div>
-        </div>
-    </div>""", unsafe_allow_html=True)
+def page_browse(summary: CircSummary, sig: int):
+    df = summary.df
+    _render_header(
+        icon="📋",
+        title_si="සියලු චක්‍රලේඛ · Browse",
+        title_en="Search &amp; Filter All Government Circulars",
+    )
 
-    if not circulars:
+    if not summary.total:
         st.error(f"Database not found: {DB_FILE}")
         return
 
@@ -572,43 +851,33 @@ def page_browse(circulars: list):
     with c3:
         dl_only = st.checkbox("Has deadline", False)
 
-    filtered = circulars
-    if q:
-        ql = q.lower()
-        filtered = [c for c in filtered if
-                    ql in c["topic"].lower() or ql in c["circular_number"].lower() or
-                    ql in c["summary"].lower() or ql in c["applies_to"].lower()]
-    if lf == "සිංහල":
-        filtered = [c for c in filtered if c["language"] == "S"]
-    elif lf == "English":
-        filtered = [c for c in filtered if c["language"] == "E"]
-    if dl_only:
-        filtered = [c for c in filtered if c["deadline"] and c["deadline"] not in ("null","None","")]
+    filtered = df.iloc[_browse_rows(q, lf, dl_only, sig)]
 
-    st.caption(f"**{len(filtered)}** of **{len(circulars)}** circulars")
+    n_pages = max(1, -(-len(filtered) // PAGE_SIZE))
+    cap_col, page_col = st.columns([5, 1])
+    cap_col.caption(f"**{len(filtered)}** of **{summary.total}** circulars")
+    page_no = page_col.number_input("Page", 1, n_pages, 1) if n_pages > 1 else 1
     st.divider()
 
-    import base64 as _base64
-    rows_html = ""
-    for c in filtered:
-        lang_badge = '<span class="b-si">සිං</span>' if c["language"] == "S" else '<span class="b-en">EN</span>'
-        dl_badge   = f'<span class="b-dl">⚠️ {c["deadline"]}</span>' if c["deadline"] and c["deadline"] not in ("null","None","") else ""
-        topic_disp   = c['topic'][:70] + ('...' if len(c['topic']) > 70 else '')
-        summary_disp = c['summary'][:100] + ('...' if len(c['summary']) > 100 else '')
-        pdf_cell = "&mdash;"
-        pdf_path_obj = resolve_pdf_path(c.get("pdf_path", ""))
-        if pdf_path_obj:
-            with open(pdf_path_obj, "rb") as _f:
-                _b64 = _base64.b64encode(_f.read()).decode()
-            pdf_cell = f'<a class="dl-btn" href="data:application/pdf;base64,{_b64}" download="{pdf_path_obj.name}">📥 PDF</a>'
-        rows_html += f"""<tr>
-            <td>{c['circular_number']}</td>
-            <td class='date-col'>{c['issued_date'] or '&mdash;'}</td>
+    # Only the visible page is rendered
+    view      = filtered.iloc[(page_no - 1) * PAGE_SIZE : page_no * PAGE_SIZE]
+    pdf_index = _pdf_index()
+    rows = []
+    for c in view.itertuples(index=False):
+        lang_badge = '<span class="b-si">සිං</span>' if c.language == "S" else '<span class="b-en">EN</span>'
+        dl_badge   = f'<span class="b-dl">⚠️ {c.deadline}</span>' if c.has_deadline else ""
+        # A link, not the file (opens in a new tab): the PDF is only read when someone follows it (see render_pdf_request)
+        rel = c.pdf_path.replace("\\", "/")
+        pdf_cell = (f'<a class="dl-btn" href="?pdf={quote(rel)}" target="_blank">📥 PDF</a>'
+                    if rel in pdf_index else "&mdash;")
+        rows.append(f"""<tr>
+            <td>{c.circular_number}</td>
+            <td class='date-col'>{c.issued_date or '&mdash;'}</td>
             <td>{lang_badge}</td>
-            <td class='topic-col'>{topic_disp}<br><span style='color:#8a90a8;font-size:11px'>{summary_disp}</span></td>
+            <td class='topic-col'>{c.topic70}<br><span style='color:#8a90a8;font-size:11px'>{c.summary100}</span></td>
             <td class='date-col'>{dl_badge}</td>
             <td>{pdf_cell}</td>
-        </tr>"""
+        </tr>""")
 
     st.markdown(f"""
     <div class="circ-table-wrap">
@@ -616,7 +885,7 @@ def page_browse(circulars: list):
     <thead><tr>
         <th>Circular #</th><th>Date</th><th>Lang</th><th>Topic / Summary</th><th>Deadline</th><th>Download</th>
     </tr></thead>
-    <tbody>{rows_html}</tbody>
+    <tbody>{"".join(rows)}</tbody>
     </table></div>""", unsafe_allow_html=True)
 
 
@@ -624,26 +893,23 @@ def page_browse(circulars: list):
 # PAGE 3 — Dashboard  (Sinhala first)
 # ══════════════════════════════════════════════════════════════════════════════
 
-def page_dashboard(circulars: list):
-    st.markdown("""
-    <div class='app-header'>
-        <span class='header-flag'>🇱🇰</span><span class='header-icon'>📊</span>
-        <div style='display:inline-block;vertical-align:middle'>
-            <div class='header-sinhala'>දත්ත පුවරුව · Dashboard</div>
-            <div class='header-english'>Statistics, Analytics &amp; Deadline Tracker</div>
-        </div>
-    </div>""", unsafe_allow_html=True)
+def page_dashboard(summary: CircSummary):
+    _render_header(
+        icon="📊",
+        title_si="දත්ත පුවරුව · Dashboard",
+        title_en="Statistics, Analytics &amp; Deadline Tracker",
+    )
 
-    if not circulars:
+    if not summary.total:
         st.error("No data.")
         return
 
-    total = len(circulars)
-    si    = sum(1 for c in circulars if c["language"] == "S")
-    en    = sum(1 for c in circulars if c["language"] == "E")
-    dls   = sum(1 for c in circulars if c["deadline"] and c["deadline"] not in ("null","None",""))
-    yr25  = sum(1 for c in circulars if c["issued_date"].startswith("2025"))
-    yr26  = sum(1 for c in circulars if c["issued_date"].startswith("2026"))
+    total = summary.total
+    si    = summary.si
+    en    = summary.en
+    dls   = summary.dls
+    yr25  = summary.yr25
+    yr26  = summary.yr26
 
     # ── Sinhala first in metrics ──
     for col, (val, lbl, col_hex) in zip(
@@ -665,74 +931,38 @@ def page_dashboard(circulars: list):
 
     with col_l:
         st.subheader("📅 By Year")
-        year_cnt = {}
-        for c in circulars:
-            y = (c["issued_date"] or "unknown")[:4]
-            year_cnt[y] = year_cnt.get(y, 0) + 1
-        for yr, cnt in sorted(year_cnt.items(), reverse=True):
-            pct = cnt * 100 // total
-            st.markdown(f"""
-            <div style='margin-bottom:14px'>
-                <div style='display:flex;justify-content:space-between;font-size:14px;font-weight:500'>
-                    <span>{yr}</span><span style='color:#c8102e;font-weight:700'>{cnt}</span>
-                </div>
-                <div style='background:#e8eaf0;border-radius:6px;height:10px;margin-top:6px'>
-                    <div style='background:linear-gradient(90deg,#c8102e,#d4af37);width:{pct}%;height:10px;border-radius:6px'></div>
-                </div>
-            </div>""", unsafe_allow_html=True)
+        st.markdown(_bars_html(YEAR_BAR_HTML, summary.year_cnt, total), unsafe_allow_html=True)
 
     with col_r:
         st.subheader("🏛️ By Ministry")
-        min_cnt = {}
-        for c in circulars:
-            m = (c["issued_by"] or "Unknown")[:40]
-            min_cnt[m] = min_cnt.get(m, 0) + 1
-        for m, cnt in sorted(min_cnt.items(), key=lambda x: -x[1])[:6]:
-            pct = cnt * 100 // total
-            st.markdown(f"""
-            <div style='margin-bottom:12px'>
-                <div style='display:flex;justify-content:space-between;font-size:13px;font-weight:500'>
-                    <span>{m}</span><span style='color:#1d4ed8;font-weight:700'>{cnt}</span>
-                </div>
-                <div style='background:#e8eaf0;border-radius:6px;height:8px;margin-top:5px'>
-                    <div style='background:linear-gradient(90deg,#1d4ed8,#60a5fa);width:{pct}%;height:8px;border-radius:6px'></div>
-                </div>
-            </div>""", unsafe_allow_html=True)
+        st.markdown(_bars_html(MINISTRY_BAR_HTML, summary.min_cnt, total), unsafe_allow_html=True)
 
     st.divider()
 
     # ── Sinhala circulars listed first ──
     st.subheader(f"⚠️ Circulars With Deadlines ({dls})")
-    dl_circulars = [c for c in circulars if c["deadline"] and c["deadline"] not in ("null","None","")]
-    dl_si = [c for c in dl_circulars if c["language"] == "S"]
-    dl_en = [c for c in dl_circulars if c["language"] == "E"]
-    for c in dl_si + dl_en:
-        lb = '<span class="b-si">සිං</span>' if c["language"] == "S" else '<span class="b-en">EN</span>'
-        st.markdown(f"""
-        <div class="card" style='display:flex;justify-content:space-between;align-items:center'>
-            <div>
-                <span class="b-num">{c['circular_number']}</span>&nbsp;{lb}&nbsp;
-                <span style='color:#374060;font-size:14px;font-weight:500'>{c['topic'][:65]}{"…" if len(c["topic"])>65 else ""}</span>
-            </div>
-            <span class="b-dl" style='white-space:nowrap'>⚠️ {c['deadline']}</span>
-        </div>""", unsafe_allow_html=True)
+    # One markdown delta for the whole list rather than one per card
+    cards_html = "".join(DEADLINE_CARD_HTML.format(
+        number=c.circular_number,
+        badge='<span class="b-si">සිං</span>' if c.language == "S" else '<span class="b-en">EN</span>',
+        topic=c.topic65,
+        deadline=c.deadline,
+    ) for c in summary.df.loc[summary.df["has_deadline"]].itertuples(index=False))   # already Sinhala first
+    if cards_html:
+        st.markdown(f"<div>{cards_html}</div>", unsafe_allow_html=True)
 
     st.divider()
     st.subheader("🕐 Most Recent — සිංහල පළමු")
-    import pandas as pd
-    # ── Sinhala first, then English ──
-    recent_si = sorted([c for c in circulars if c["language"] == "S" and c["issued_date"]],
-                       key=lambda x: x["issued_date"], reverse=True)[:5]
-    recent_en = sorted([c for c in circulars if c["language"] == "E" and c["issued_date"]],
-                       key=lambda x: x["issued_date"], reverse=True)[:5]
-    df = pd.DataFrame([{
-        "Number"  : c["circular_number"],
-        "Date"    : c["issued_date"],
-        "Lang"    : "සිංහල" if c["language"] == "S" else "English",
-        "Topic"   : c["topic"][:65] + ("…" if len(c["topic"]) > 65 else ""),
-        "Deadline": c["deadline"] or "—",
-    } for c in recent_si + recent_en])
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    # ── Sinhala first, then English ── (groupby.head keeps the frame's Sinhala-first order)
+    recent = summary.df[summary.df["issued_date"] != ""].groupby("language", observed=True).head(RECENT_N)
+    df = pd.DataFrame({
+        "Number"  : recent["circular_number"],
+        "Date"    : recent["issued_date"],
+        "Lang"    : np.where(recent["is_si"], "සිංහල", "English"),
+        "Topic"   : recent["topic65"],
+        "Deadline": recent["deadline"].replace("", "—"),
+    })
+    st.dataframe(df, width="stretch", hide_index=True)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -740,14 +970,11 @@ def page_dashboard(circulars: list):
 # ══════════════════════════════════════════════════════════════════════════════
 
 def page_setup():
-    st.markdown("""
-    <div class='app-header'>
-        <span class='header-flag'>⚙️</span>
-        <div style='display:inline-block;vertical-align:middle'>
-            <div class='header-sinhala'>පද්ධති සැකසුම</div>
-            <div class='header-english'>Setup · Configuration &amp; Installation</div>
-        </div>
-    </div>""", unsafe_allow_html=True)
+    _render_header(
+        flag="⚙️",
+        title_si="පද්ධති සැකසුම",
+        title_en="Setup · Configuration &amp; Installation",
+    )
 
     with st.expander("**Step 1 — Install packages**", expanded=True):
         st.code("pip install -r requirements.txt", language="bash")
@@ -756,12 +983,12 @@ def page_setup():
         st.code("python build_vectorstore.py", language="bash")
         status_col, btn_col = st.columns([2, 1])
         with status_col:
-            if Path(CHROMA_DIR).exists():
+            if _paths_status()["vec"]:
                 st.success("✅ Vector store found — ready!")
             else:
                 st.warning("⚠️ Vector store not built yet")
         with btn_col:
-            if st.button("🔨 Build Now", type="primary", use_container_width=True):
+            if st.button("🔨 Build Now", type="primary", width="stretch"):
                 if not Path(DB_FILE).exists():
                     st.error(f"Cannot find {DB_FILE}")
                 else:
@@ -772,6 +999,10 @@ def page_setup():
                         sys.stdout = buf = io.StringIO()
                         build_vectorstore()
                         sys.stdout = old_stdout
+                        _qa_collection.clear()   # reopen the rebuilt collection on the next question
+                        if clear_retrieval_cache:
+                            clear_retrieval_cache()
+                        _paths_status.clear()
                         st.success("✅ Vector store built!")
                         st.balloons()
                     except Exception as e:
@@ -782,13 +1013,22 @@ def page_setup():
         st.code("streamlit run app.py", language="bash")
         st.success("✅ Already running!")
 
+    with st.expander("**Reload data**"):
+        st.caption(f"Circulars reload automatically when {DB_FILE} changes. Use this to force a re-read.")
+        if st.button("🔄 Reload circulars", key="reload_data"):
+            clear_data_caches()
+            st.success("✅ Cache cleared — fresh data on next view")
+
     st.divider()
     st.subheader("📁 File Structure")
     st.code("""
 sl-circulars-monitor/
 ├── app.py                  ← Streamlit UI
+├── assets/app.css          ← UI styles (loaded by app.py)
 ├── qa_chain.py             ← LangChain RAG chain
 ├── build_vectorstore.py    ← ChromaDB builder
+├── db.py                   ← read-only circulars.db helper
+├── shared.py               ← count_sinhala + fast JSON helpers
 ├── run_pipeline.py         ← Daily pipeline
 ├── new_detector.py         ← Week 8: new circular detector
 ├── reprocess_sinhala.py    ← Sinhala fix tool
@@ -803,17 +1043,23 @@ sl-circulars-monitor/
 # ══════════════════════════════════════════════════════════════════════════════
 
 def main():
-    circulars     = load_all_circulars()
-    page, api_key = render_sidebar(circulars)
+    # Browse PDF links open a new tab — that tab gets the download bar only, not Home
+    if render_pdf_request():
+        return
+
+    sig           = _db_mtime()   # one DB signature per run, shared by every loader
+    stats         = load_stats(sig)
+    page, api_key = render_sidebar(stats)
 
+    # Full rows are only loaded for pages that list individual circulars
     if page == "🏠 Home":
-        page_home(circulars, api_key)
+        page_home(load_highlights(sig), stats, api_key)
     elif page == "🤖 AI Q&A":
         page_qa(api_key)
     elif page == "📋 Browse":
-        page_browse(circulars)
+        page_browse(load_summary(sig), sig)
     elif page == "📊 Dashboard":
-        page_dashboard(circulars)
+        page_dashboard(load_summary(sig))
     elif page == "⚙️ Setup":
         page_setup()
 
@@ -9,34 +9,103 @@ Reads circulars.db (same DB from weeks 1-6)
 Run ONCE before launching Streamlit:
     python build_vectorstore.py
 
+Re-running only embeds new or changed circulars (and drops deleted ones).
+Force a from-scratch rebuild with:
+    python build_vectorstore.py --rebuild
+
 Requirements:
     pip install chromadb sentence-transformers
 """
 
-import sqlite3
+import hashlib
+import os
 import json
+import sys
+from dataclasses import dataclass
 from pathlib import Path
 
 import chromadb
 from chromadb.utils import embedding_functions
 
+from db import open_ro
+from shared import json_loads
+
 # ── Config ────────────────────────────────────────────────────────────────────
 DB_FILE     = "circulars.db"
 CHROMA_DIR  = "./chroma_db"
 COLLECTION  = "circulars"
 EMBED_MODEL = "all-MiniLM-L6-v2"   # 90 MB, CPU-only, no API key needed
+EMBED_ONNX  = "onnx/model_quint8_avx2.onnx"   # int8-quantised export shipped in the model repo
+EMBED_CACHE = os.environ.get(                  # fixed model dir — download once, reuse every run
+    "EMBED_CACHE_DIR", str(Path.home() / ".cache" / "sl-circulars" / "st"))
+
+
+def parse_key_instructions(raw: str | None) -> list:
+    """key_instructions column → list. Plain text skips the JSON parser entirely."""
+    if not raw:
+        return []
+    if raw[0] not in '[{"':
+        return [raw]
+    try:
+        ki = json_loads(raw)
+    except ValueError:
+        return [raw]
+    return [ki] if isinstance(ki, str) else ki
+
+
+def make_embed_fn():
+    """
+    MiniLM embedding function shared with qa_chain (index and queries must match).
+    Runs the int8 ONNX export under onnxruntime when sentence-transformers[onnx]
+    is installed — no autograd, fused int8 GEMMs — and falls back to PyTorch.
+    Vectors are unit-length, so cosine == dot product.
+    The returned function's .backend names the model + backend it actually runs.
+    """
+    try:
+        fn = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=EMBED_MODEL, normalize_embeddings=True, device="cpu",
+            cache_folder=EMBED_CACHE,
+            backend="onnx", model_kwargs={"file_name": EMBED_ONNX},
+        )
+        fn.backend = f"{EMBED_MODEL}|onnx|{EMBED_ONNX}"
+    except Exception as e:
+        print(f"⚠️  ONNX backend unavailable ({e}) — using PyTorch")
+        fn = embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=EMBED_MODEL, normalize_embeddings=True, device="cpu",
+            cache_folder=EMBED_CACHE,
+        )
+        fn.backend = f"{EMBED_MODEL}|torch"
+    return fn
+
+
+@dataclass(slots=True)
+class Circulars:
+    """Summarised circulars as parallel columns — one list per field, row i across all of them."""
+    row_id           : list[int]
+    circular_number  : list[str]
+    issued_date      : list[str]
+    issued_by        : list[str]
+    topic            : list[str]
+    summary          : list[str]
+    key_instructions : list[list]
+    applies_to       : list[str]
+    deadline         : list[str]
+    language         : list[str]
+
+    def __len__(self) -> int:
+        return len(self.circular_number)
 
 
-def load_circulars() -> list[dict]:
+def load_circulars() -> Circulars:
     """Load every summarised circular from your existing circulars.db."""
     if not Path(DB_FILE).exists():
         raise FileNotFoundError(
             f"\n❌  Cannot find '{DB_FILE}'.\n"
             "    Copy circulars.db into this folder and try again."
         )
-    conn = sqlite3.connect(DB_FILE)
+    conn = open_ro(DB_FILE)
     rows = conn.execute("""
-        SELECT circular_number, issued_date, issued_by,
+        SELECT id, circular_number, issued_date, issued_by,
                topic, summary, key_instructions,
                applies_to, deadline, language
         FROM   circulars
@@ -45,51 +114,65 @@ def load_circulars() -> list[dict]:
     """).fetchall()
     conn.close()
 
-    out = []
-    for r in rows:
-        # key_instructions stored as JSON string in DB (from run_pipeline.py)
-        try:
-            ki = json.loads(r[5]) if r[5] else []
-            if isinstance(ki, str):
-                ki = [ki]
-        except Exception:
-            ki = [r[5]] if r[5] else []
-
-        out.append({
-            "circular_number"  : (r[0] or "").strip(),
-            "issued_date"      : (r[1] or ""),
-            "issued_by"        : (r[2] or ""),
-            "topic"            : (r[3] or ""),
-            "summary"          : (r[4] or ""),
-            "key_instructions" : ki,
-            "applies_to"       : (r[6] or ""),
-            "deadline"         : (r[7] or ""),
-            "language"         : (r[8] or "E"),
-        })
-    return out
-
-
-def make_document(c: dict) -> str:
+    # Transpose once, then clean each column with its own comprehension
+    (row_id, number, issued_date, issued_by, topic, summary,
+     ki_raw, applies_to, deadline, language) = zip(*rows) if rows else ((),) * 10
+    return Circulars(
+        row_id           = list(row_id),
+        circular_number  = [(v or "").strip() for v in number],
+        issued_date      = [v or "" for v in issued_date],
+        issued_by        = [v or "" for v in issued_by],
+        topic            = [v or "" for v in topic],
+        summary          = [v or "" for v in summary],
+        key_instructions = [parse_key_instructions(v) for v in ki_raw],   # JSON string from run_pipeline.py
+        applies_to       = [v or "" for v in applies_to],
+        deadline         = [v or "" for v in deadline],
+        language         = [v or "E" for v in language],
+    )
+
+
+# Document layout — filled by make_document() with one format_map() call
+_DOC_TMPL = (
+    "Circular Number: {circular_number}\n"
+    "Language: {lang}\n"
+    "Date Issued: {issued_date}\n"
+    "Issued By: {issued_by}\n"
+    "Topic: {topic}\n"
+    "Summary: {summary}\n"
+    "Key Instructions:\n"
+    "{instrs}\n"
+    "Applies To: {applies_to}\n"
+    "Deadline: {deadline}"
+)
+_DOC_FMT    = _DOC_TMPL.format_map
+_NONE_INSTR = "  (none listed)"
+_LANGS      = {"E": "English"}   # anything else is Sinhala
+
+
+def make_document(i: int, C: Circulars) -> str:
     """
-    Build a rich searchable string for each circular.
+    Build a rich searchable string for circular i.
     The more detail here, the better semantic search works.
     """
-    lang   = "English" if c["language"] == "E" else "Sinhala (සිංහල)"
-    instrs = "\n".join(f"  • {i}" for i in c["key_instructions"]) \
-             if c["key_instructions"] else "  (none listed)"
-    return f"""Circular Number: {c['circular_number']}
-Language: {lang}
-Date Issued: {c['issued_date'] or 'unknown'}
-Issued By: {c['issued_by']}
-Topic: {c['topic']}
-Summary: {c['summary']}
-Key Instructions:
-{instrs}
-Applies To: {c['applies_to'] or 'not specified'}
-Deadline: {c['deadline'] or 'none'}"""
-
-
-def build_vectorstore():
+    return _DOC_FMT({
+        "circular_number": C.circular_number[i],
+        "lang"           : _LANGS.get(C.language[i], "Sinhala (සිංහල)"),
+        "issued_date"    : C.issued_date[i] or "unknown",
+        "issued_by"      : C.issued_by[i],
+        "topic"          : C.topic[i],
+        "summary"        : C.summary[i],
+        "instrs"         : "\n".join([f"  • {k}" for k in C.key_instructions[i]]) or _NONE_INSTR,
+        "applies_to"     : C.applies_to[i] or "not specified",
+        "deadline"       : C.deadline[i] or "none",
+    })
+
+
+def doc_hash(doc: str, backend: str) -> str:
+    """Content hash stored with each vector — same hash, same model + backend → no need to re-embed."""
+    return hashlib.blake2b(f"{backend}\n{doc}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def build_vectorstore(rebuild: bool = False):
     print("\n" + "="*60)
     print("  Week 7 — Building ChromaDB Vector Store")
     print("="*60)
@@ -97,53 +180,91 @@ def build_vectorstore():
     # Load
     print(f"\n📂  Loading from '{DB_FILE}' ...")
     circulars = load_circulars()
-    en = sum(1 for c in circulars if c["language"] == "E")
-    si = sum(1 for c in circulars if c["language"] == "S")
+    en = circulars.language.count("E")
+    si = circulars.language.count("S")
     print(f"    {len(circulars)} circulars  (English: {en}, Sinhala: {si})")
 
     # ChromaDB + local embeddings
     print(f"\n🧠  Initialising ChromaDB  ({EMBED_MODEL})")
-    print("    First run downloads ~90 MB model — takes ~60 sec")
-    embed_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name=EMBED_MODEL
-    )
+    print(f"    First run downloads ~90 MB model to {EMBED_CACHE} — later runs load it from disk")
+    embed_fn = make_embed_fn()
     client = chromadb.PersistentClient(path=CHROMA_DIR)
+    # Keep the existing collection so unchanged circulars are not re-embedded.
+    # Start over on --rebuild, if it predates the inner-product index, or if it
+    # was embedded by another backend (int8 ONNX and fp32 PyTorch vectors must
+    # never share a collection — queries are embedded with one of them).
+    coll_meta = {
+        "hnsw:space"   : "ip",   # vectors are unit-length, so ip ranks exactly like cosine
+        "embed_backend": embed_fn.backend,
+    }
     try:
-        client.delete_collection(COLLECTION)
-        print("    Cleared previous collection")
+        collection = client.get_collection(COLLECTION, embedding_function=embed_fn)
+        old_meta   = collection.metadata or {}
+        if rebuild or any(old_meta.get(k) != v for k, v in coll_meta.items()):
+            client.delete_collection(COLLECTION)
+            collection = None
+            if not rebuild and old_meta.get("embed_backend") not in (None, embed_fn.backend):
+                print(f"    Embedding backend changed ({old_meta['embed_backend']} → {embed_fn.backend})")
+            print("    Cleared previous collection")
     except Exception:
-        pass
-    collection = client.create_collection(
-        name=COLLECTION,
-        embedding_function=embed_fn,
-        metadata={"hnsw:space": "cosine"},
-    )
+        collection = None
+    if collection is None:
+        collection = client.create_collection(
+            name=COLLECTION,
+            embedding_function=embed_fn,
+            metadata=coll_meta,
+        )
+
+    # Work out what changed since the last build. ids use the DB row id, so
+    # they stay put when newer circulars are inserted ahead of them.
+    C      = circulars
+    docs   = [make_document(i, C) for i in range(len(C))]
+    ids    = [f"{n}_{l}_{r}" for n, l, r in zip(C.circular_number, C.language, C.row_id)]
+    hashes = [doc_hash(d, embed_fn.backend) for d in docs]
+    stored = collection.get(include=["metadatas"])
+    stored = {i: (m or {}).get("doc_hash") for i, m in zip(stored["ids"], stored["metadatas"])}
+    gone   = sorted(set(stored) - set(ids))
+    todo   = [i for i in range(len(C)) if stored.get(ids[i]) != hashes[i]]
+    if gone:
+        collection.delete(ids=gone)
+    print(f"    {len(todo)} new/changed, {len(C) - len(todo)} unchanged, {len(gone)} removed")
 
     # Embed in batches
-    print(f"\n📥  Embedding {len(circulars)} documents ...")
-    BATCH = 32
-    for start in range(0, len(circulars), BATCH):
-        batch = circulars[start : start + BATCH]
-        ids       = [f"{c['circular_number']}_{c['language']}_{start+i}"
-                     for i, c in enumerate(batch)]
-        documents = [make_document(c) for c in batch]
-        metadatas = [{
-            "circular_number"      : c["circular_number"],
-            "issued_date"          : c["issued_date"],
-            "issued_by"            : c["issued_by"],
-            "topic"                : c["topic"],
-            "applies_to"           : c["applies_to"],
-            "deadline"             : c["deadline"] or "",
-            "language"             : c["language"],
-            "summary"              : c["summary"][:600],
-            "key_instructions_json": json.dumps(c["key_instructions"],
-                                                ensure_ascii=False)[:500],
-        } for c in batch]
-        collection.add(ids=ids, documents=documents, metadatas=metadatas)
-        done = min(start + BATCH, len(circulars))
-        filled = done * 30 // len(circulars)
+    print(f"\n📥  Embedding {len(todo)} documents ...")
+    EMBED_BATCH = 32    # encoder batch — small, so smart batching keeps padding low
+    ADD_BATCH   = 250   # collection.upsert batch — each call is one Chroma/SQLite write
+    # Smart batching: similar-length documents share a batch, so less of each
+    # padded batch is padding. Vectors are stored back by position.
+    order = sorted(todo, key=lambda i: len(docs[i]))
+    embeddings = [None] * len(docs)
+    for start in range(0, len(order), EMBED_BATCH):
+        idx = order[start : start + EMBED_BATCH]
+        for i, vec in zip(idx, embed_fn([docs[i] for i in idx])):
+            embeddings[i] = vec
+        done = min(start + EMBED_BATCH, len(order))
+        filled = done * 30 // len(order)
         bar    = "█" * filled + "░" * (30 - filled)
-        print(f"    [{bar}] {done}/{len(circulars)}", end="\r")
+        print(f"    [{bar}] {done}/{len(order)}", end="\r")
+
+    # Store — precomputed embeddings, so upsert() only writes
+    metadatas = [{
+        "circular_number"      : C.circular_number[i],
+        "issued_date"          : C.issued_date[i],
+        "issued_by"            : C.issued_by[i],
+        "topic"                : C.topic[i],
+        "applies_to"           : C.applies_to[i],
+        "deadline"             : C.deadline[i],
+        "language"             : C.language[i],
+        "summary"              : C.summary[i][:600],
+        "key_instructions_json": json.dumps(C.key_instructions[i],
+                                            ensure_ascii=False)[:500],
+        "doc_hash"             : hashes[i],
+    } for i in todo]
+    for start in range(0, len(todo), ADD_BATCH):
+        batch = todo[start : start + ADD_BATCH]
+        collection.upsert(ids=[ids[i] for i in batch], documents=[docs[i] for i in batch],
+                          embeddings=[embeddings[i] for i in batch],
+                          metadatas=metadatas[start : start + ADD_BATCH])
 
     print(f"\n\n🔍  Test: 'salary revision 2025' ...")
     r = collection.query(query_texts=["salary revision 2025"], n_results=3)
@@ -157,4 +278,4 @@ def build_vectorstore():
 
 
 if __name__ == "__main__":
-    build_vectorstore()
+    build_vectorstore(rebuild="--rebuild" in sys.argv[1:])
@@ -17,14 +17,16 @@ Output:
     - Saves  sinhala_check_report.json  for reference
 """
 
-import json
+import multiprocessing
 import os
 import re
-import sqlite3
 from pathlib import Path
 
 import fitz   # PyMuPDF — pip install pymupdf
 
+from db import open_ro
+from shared import count_sinhala, json_bytes
+
 # ── Config ────────────────────────────────────────────────────────────────────
 DOWNLOAD_DIR = Path('downloads')
 DB_FILE      = 'circulars.db'
@@ -37,17 +39,20 @@ SINHALA_RE   = re.compile(r'[\u0d80-\u0dff]')
 # Thresholds
 MIN_CHARS_GOOD    = 100   # at least 100 chars = meaningful text
 MIN_SINHALA_RATIO = 0.05  # at least 5% of chars should be Sinhala Unicode
+EARLY_EXIT_CHARS  = 20000 # enough text to classify — stop reading pages once it's clearly Sinhala
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def classify_text(text: str) -> tuple[str, str]:
+def classify_text(text: str, sinhala_chars: int | None = None) -> tuple[str, str]:
     """
     Classify extracted text into one of four categories.
+    Pass sinhala_chars when the caller already counted them, to skip a second scan.
     Returns (status_code, description)
     """
     total_chars   = len(text.strip())
-    sinhala_chars = len(SINHALA_RE.findall(text))
+    if sinhala_chars is None:
+        sinhala_chars = count_sinhala(text)
 
     if total_chars < 20:
         return 'EMPTY', f'Only {total_chars} chars — blank PDF or download failed'
@@ -75,24 +80,34 @@ def classify_text(text: str) -> tuple[str, str]:
     )
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract all text from a PDF using PyMuPDF (native, no OCR)."""
+def extract_text_from_pdf(pdf_path: Path) -> tuple[str, int]:
+    """
+    Extract text from a PDF using PyMuPDF (native, no OCR).
+    Stops early once EARLY_EXIT_CHARS have been read and the text is already
+    clearly Sinhala — more pages would not change a GOOD verdict.
+    Returns (text, sinhala_chars) — the count comes from the same per-page pass.
+    """
     try:
-        doc  = fitz.open(pdf_path)
-        text = ''
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
+        parts, total, sinhala = [], 0, 0
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                t = page.get_text()
+                parts.append(t)
+                total   += len(t)
+                sinhala += count_sinhala(t)
+                if total >= EARLY_EXIT_CHARS and sinhala >= MIN_SINHALA_RATIO * total:
+                    break
+        return ''.join(parts), sinhala
     except Exception as e:
-        return f'ERROR: {e}'
+        err = f'ERROR: {e}'
+        return err, count_sinhala(err)
 
 
 def load_db_sinhala() -> dict:
     """Load stored Sinhala summaries from circulars.db."""
     if not Path(DB_FILE).exists():
         return {}
-    conn  = sqlite3.connect(DB_FILE)
+    conn  = open_ro(DB_FILE)
     rows  = conn.execute(
         "SELECT circular_number, topic, summary FROM circulars WHERE language = 'S'"
     ).fetchall()
@@ -106,15 +121,83 @@ def show_sinhala_sample(text: str, n: int = 3) -> list[str]:
     return lines[:n]
 
 
+# ── Per-PDF worker ────────────────────────────────────────────────────────────
+
+_db_data: dict = {}   # set once per worker process by _init_worker
+
+
+def _init_worker(db_data: dict):
+    global _db_data
+    _db_data = db_data
+
+
+def _analyze_pdf(pdf_path: Path) -> tuple[dict, str]:
+    """
+    Extract, classify and DB-check one PDF (runs in a worker process).
+    Returns (record, first_line) — first_line is only used for the LATIN console hint.
+    """
+    # Derive circular number from filename
+    # e.g.  downloads/2025/Sinhala/10-2025.pdf  →  10/2025
+    stem   = pdf_path.stem                      # e.g. "10-2025"
+    parts  = stem.split('-')
+    circ_num = f'{parts[0]}/{parts[1]}' if len(parts) == 2 else stem
+
+    # Extract text
+    text, sinhala_chars = extract_text_from_pdf(pdf_path)
+    status, description = classify_text(text, sinhala_chars)
+
+    # Check DB
+    db_entry    = _db_data.get(circ_num, {})
+    db_topic    = db_entry.get('topic', '')
+    db_summary  = db_entry.get('summary', '')
+    in_db       = bool(db_topic or db_summary)
+
+    # DB Sinhala quality check
+    db_status = '—'
+    if in_db:
+        db_sinhala = count_sinhala(db_topic + db_summary)
+        if db_sinhala > 0:
+            db_status = f'✅ {db_sinhala} Sinhala chars in DB'
+        else:
+            db_status = '⚠️  DB has Latin text only (AI gave English response)'
+
+    record = {
+        'circular_number': circ_num,
+        'pdf_path'       : str(pdf_path),
+        'status'         : status,
+        'description'    : description,
+        'in_db'          : in_db,
+        'db_status'      : db_status,
+        'db_topic'       : db_topic,
+        'sample_lines'   : show_sinhala_sample(text),
+        'total_chars'    : len(text.strip()),
+    }
+    first_line = (next((l.strip() for l in text.splitlines() if len(l.strip()) > 10), '')
+                  if status == 'LATIN' else '')
+    return record, first_line
+
+
 # ── Main check ────────────────────────────────────────────────────────────────
 
+def find_sinhala_pdfs(root: Path) -> list[str]:
+    """
+    Every *.pdf inside a 'Sinhala' folder under root, as sorted path strings.
+    os.walk rides on scandir and only builds Path objects for the hits.
+    """
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        if os.path.basename(dirpath) == 'Sinhala':
+            found.extend(os.path.join(dirpath, f) for f in filenames if f.endswith('.pdf'))
+    return sorted(found, key=lambda p: p.split(os.sep))   # same order as sorting Paths
+
+
 def check_all_sinhala_pdfs() -> dict:
     """
     Find all PDFs in downloads/*/Sinhala/ and check each one.
     Returns structured results dict.
     """
     # Find all Sinhala PDFs
-    sinhala_pdfs = sorted(DOWNLOAD_DIR.rglob('Sinhala/*.pdf'))
+    sinhala_pdfs = [Path(p) for p in find_sinhala_pdfs(DOWNLOAD_DIR)]
 
     if not sinhala_pdfs:
         print(f'\n❌  No Sinhala PDFs found in {DOWNLOAD_DIR}/')
@@ -134,70 +217,36 @@ def check_all_sinhala_pdfs() -> dict:
     print(f'  SINHALA PDF DIAGNOSTIC  —  {len(sinhala_pdfs)} PDFs found')
     print(f'{"═"*65}\n')
 
-    for pdf_path in sinhala_pdfs:
-        # Derive circular number from filename
-        # e.g.  downloads/2025/Sinhala/10-2025.pdf  →  10/2025
-        stem   = pdf_path.stem                      # e.g. "10-2025"
-        parts  = stem.split('-')
-        circ_num = f'{parts[0]}/{parts[1]}' if len(parts) == 2 else stem
-
-        # Extract text
-        text   = extract_text_from_pdf(pdf_path)
-        status, description = classify_text(text)
-
-        # Check DB
-        db_entry    = db_data.get(circ_num, {})
-        db_topic    = db_entry.get('topic', '')
-        db_summary  = db_entry.get('summary', '')
-        in_db       = bool(db_topic or db_summary)
-
-        # DB Sinhala quality check
-        db_status = '—'
-        if in_db:
-            db_sinhala = len(SINHALA_RE.findall(db_topic + db_summary))
-            if db_sinhala > 0:
-                db_status = f'✅ {db_sinhala} Sinhala chars in DB'
+    # PDFs are independent and PyMuPDF parsing is CPU-bound → one worker per spare core.
+    # imap (ordered) keeps the console output in file order; the work still runs in parallel.
+    workers = max(1, min((os.cpu_count() or 2) - 1, len(sinhala_pdfs)))
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(db_data,)) as pool:
+        for record, first_line in pool.imap(_analyze_pdf, sinhala_pdfs, chunksize=4):
+            status = record['status']
+            sample = record['sample_lines']
+            results[status].append(record)
+
+            # Print per-file result
+            icon = {'GOOD': '✅', 'LATIN': '⚠️ ', 'SCANNED': '🔍', 'EMPTY': '❌'}[status]
+            print(f'{icon} [{status:7s}]  {record["circular_number"]:20s}  {Path(record["pdf_path"]).name}')
+            print(f'           {record["description"]}')
+
+            if status == 'GOOD' and sample:
+                print(f'           Sample: "{sample[0][:60]}"')
+            elif status == 'LATIN':
+                # Show a sample of what was extracted to understand the issue
+                print(f'           Extracted: "{first_line[:70]}"')
+            elif status == 'SCANNED':
+                print(f'           → Needs OCR  (run_pipeline.py will handle this automatically)')
+
+            if record['in_db']:
+                print(f'           DB: {record["db_status"]}')
+                if record['db_topic']:
+                    print(f'           DB topic: "{record["db_topic"][:65]}"')
             else:
-                db_status = '⚠️  DB has Latin text only (AI gave English response)'
-
-        # Sample lines
-        sample = show_sinhala_sample(text)
-
-        record = {
-            'circular_number': circ_num,
-            'pdf_path'       : str(pdf_path),
-            'status'         : status,
-            'description'    : description,
-            'in_db'          : in_db,
-            'db_status'      : db_status,
-            'db_topic'       : db_topic,
-            'sample_lines'   : sample,
-            'total_chars'    : len(text.strip()),
-        }
-        results[status].append(record)
-
-        # Print per-file result
-        icon = {'GOOD': '✅', 'LATIN': '⚠️ ', 'SCANNED': '🔍', 'EMPTY': '❌'}[status]
-        print(f'{icon} [{status:7s}]  {circ_num:20s}  {pdf_path.name}')
-        print(f'           {description}')
-
-        if status == 'GOOD' and sample:
-            print(f'           Sample: "{sample[0][:60]}"')
-        elif status == 'LATIN':
-            # Show a sample of what was extracted to understand the issue
-            first_line = next((l.strip() for l in text.splitlines() if len(l.strip()) > 10), '')
-            print(f'           Extracted: "{first_line[:70]}"')
-        elif status == 'SCANNED':
-            print(f'           → Needs OCR  (run_pipeline.py will handle this automatically)')
-
-        if in_db:
-            print(f'           DB: {db_status}')
-            if db_topic:
-                print(f'           DB topic: "{db_topic[:65]}"')
-        else:
-            print(f'           DB: not yet stored')
+                print(f'           DB: not yet stored')
 
-        print()
+            print()
 
     return results
 
@@ -262,9 +311,7 @@ def save_report(results: dict):
         'summary': {s: len(v) for s, v in results.items()},
         'details': flat,
     }
-    Path(REPORT_FILE).write_text(
-        json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8'
-    )
+    Path(REPORT_FILE).write_bytes(json_bytes(report, indent=True))
     print(f'📄 Full report saved → {REPORT_FILE}\n')
 
 
@@ -279,20 +326,20 @@ def test_ocr_on_one(pdf_path: Path):
     try:
         import pytesseract
         from PIL import Image
-        import io
-
-        doc = fitz.open(pdf_path)
-        if len(doc) == 0:
-            print('  ❌ PDF has no pages')
-            return
-        page = doc[0]
-        mat  = fitz.Matrix(200 / 72, 200 / 72)
-        pix  = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY)
-        img  = Image.open(io.BytesIO(pix.tobytes('png')))
-        doc.close()
-
-        text = pytesseract.image_to_string(img, lang='sin')
-        sinhala_chars = len(SINHALA_RE.findall(text))
+
+        with fitz.open(pdf_path) as doc:
+            if len(doc) == 0:
+                print('  ❌ PDF has no pages')
+                return
+            # 150 DPI grayscale is plenty to confirm the language pack works;
+            # raw samples go straight to PIL — no PNG encode/decode round-trip
+            mat = fitz.Matrix(150 / 72, 150 / 72)
+            pix = doc[0].get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+            img = Image.frombytes('L', (pix.width, pix.height), pix.samples)
+
+        # LSTM engine only, one uniform block of text — a single-column circular
+        text = pytesseract.image_to_string(img, lang='sin', config='--oem 1 --psm 6')
+        sinhala_chars = count_sinhala(text)
 
         print(f'  OCR extracted {len(text)} chars, {sinhala_chars} Sinhala Unicode chars')
         if sinhala_chars > 0:
@@ -0,0 +1,28 @@
+"""
+db.py — shared read-only access to circulars.db
+================================================
+The app and the report / index scripts (build_vectorstore, check_sinhala,
+check_db_sinhala, new_detector, qa_chain) only ever READ the database, so they
+open it through open_ro():
+
+  - mode=ro        — a reader can never create, lock for writing or modify the
+                     file that run_pipeline.py commits back to the repo
+  - mmap_size      — pages are read straight from the OS page cache instead of
+                     being copied into SQLite's own cache first
+
+The journal mode is left alone on purpose: WAL keeps recent writes in a
+circulars.db-wal side file, and the DB is committed to git as a single file.
+"""
+
+import sqlite3
+from pathlib import Path
+
+MMAP_SIZE = 256 * 1024 * 1024   # upper bound only — SQLite maps what the file needs
+
+
+def open_ro(path: str | Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open an existing SQLite file read-only with memory-mapped reads."""
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True,
+                           check_same_thread=check_same_thread)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
@@ -25,22 +25,38 @@ Why this is useful vs just run_pipeline.py:
 import json
 import os
 import re
-import sqlite3
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from db import open_ro
+from shared import json_bytes
+
+# lxml (libxml2, C) parses each listing page several times faster than the
+# pure-Python html.parser; same BeautifulSoup API either way
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 # ── Config ────────────────────────────────────────────────────────────────────
-BASE_URL      = 'https://pubad.gov.lk'
-TARGET_YEARS  = {'2025', '2026'}
-DB_FILE       = 'circulars.db'
-REPORT_FILE   = 'new_circulars_report.json'
-SLACK_WEBHOOK = os.environ.get('SLACK_WEBHOOK_URL', '')
-DELAY         = 1   # seconds between page requests
+BASE_URL       = 'https://pubad.gov.lk'
+TARGET_YEARS   = {'2025', '2026'}
+DB_FILE        = 'circulars.db'
+REPORT_FILE    = 'new_circulars_report.json'
+SLACK_WEBHOOK  = os.environ.get('SLACK_WEBHOOK_URL', '')
+DELAY          = 1   # seconds between page requests
+PAGE_LOOKAHEAD = 4   # listing pages in flight — request starts stay DELAY apart
+TITLE_OVERLAP  = 0.5 # title/topic word-set Jaccard below this → possible amendment
 
 HEADERS = {
     'User-Agent': (
@@ -50,69 +66,98 @@ HEADERS = {
     )
 }
 DATE_PATTERN = re.compile(r'^(20\d{2})-(\d{2})-(\d{2})$')
+WORD_RE      = re.compile(r'\w+')
+
+# One keep-alive session for every page — no fresh TCP + TLS handshake per
+# request. Transient gateway errors are retried with backoff instead of
+# ending the scan on the first hiccup.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', HTTPAdapter(max_retries=Retry(
+    total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+)))
 
 
 # ── Scrape ALL circulars in target years from the website ─────────────────────
 
+def _page_url(offset: int) -> str:
+    return (
+        f'{BASE_URL}/web/index.php?option=com_circular&view=circulars'
+        f'&Itemid=176&lang=en'
+        + (f'&limitstart={offset}' if offset else '')
+    )
+
+
 def scrape_all_circulars() -> list[dict]:
     """
     Scrape every circular in TARGET_YEARS from the website.
     Returns a list of dicts: {number, title, date, year, detail_url}
     """
-    found  = []
-    offset = 0
+    found   = []
+    offset  = 0    # next page to parse — strictly in order
+    next_at = 0    # next page to request
+    pending = {}
+    send_at = 0.0  # earliest monotonic time the next request may start
 
     print('🌐 Scanning website...')
-    while True:
-        url = (
-            f'{BASE_URL}/web/index.php?option=com_circular&view=circulars'
-            f'&Itemid=176&lang=en'
-            + (f'&limitstart={offset}' if offset else '')
-        )
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=30)
-            r.raise_for_status()
-        except Exception as e:
-            print(f'  ⚠️  Page fetch error (offset {offset}): {e}')
-            break
-
-        soup   = BeautifulSoup(r.text, 'html.parser')
-        tables = soup.find_all('table')
-        if len(tables) < 2:
-            break
-
-        rows       = tables[1].find_all('tr')
-        found_old  = False
-        page_count = 0
-
-        for tr in rows:
-            cells = tr.find_all('td')
-            if len(cells) < 3:
-                continue
-            number   = cells[0].get_text(strip=True)
-            title    = cells[1].get_text(strip=True)
-            date_str = cells[2].get_text(strip=True)
-            m = DATE_PATTERN.match(date_str)
-            if not m:
-                continue
-            year = m.group(1)
-            if year not in TARGET_YEARS:
-                found_old = True
-                continue
-            a_tag      = cells[1].find('a', href=True)
-            detail_url = urljoin(BASE_URL, a_tag['href']) if a_tag else None
-            found.append({
-                'number': number, 'title': title,
-                'date': date_str, 'year': year,
-                'detail_url': detail_url,
-            })
-            page_count += 1
-
-        print(f'  Page offset={offset}: found {page_count} target-year rows')
-        if found_old:
-            break
-        offset += 10
-        time.sleep(DELAY)
+    # Speculative lookahead: keep PAGE_LOOKAHEAD pages in flight so the round
+    # trips overlap, but parse them in offset order so stopping is unchanged.
+    # Requests still start at most one per DELAY — the lookahead only hides
+    # the round-trip time, it doesn't raise the load on the server.
+    with ThreadPoolExecutor(max_workers=PAGE_LOOKAHEAD) as pool:
+        while True:
+            # Top up only when a request is due — never make the parse wait on the schedule
+            while len(pending) < PAGE_LOOKAHEAD and (not pending or time.monotonic() >= send_at):
+                time.sleep(max(send_at - time.monotonic(), 0))   # stay polite to the server
+                send_at = time.monotonic() + DELAY
+                pending[next_at] = pool.submit(SESSION.get, _page_url(next_at), timeout=30)
+                next_at += 10
+            try:
+                r = pending.pop(offset).result()
+                r.raise_for_status()
+            except Exception as e:
+                print(f'  ⚠️  Page fetch error (offset {offset}): {e}')
+                break
+
+            soup   = BeautifulSoup(r.text, HTML_PARSER)
+            tables = soup.find_all('table')
+            if len(tables) < 2:
+                break
+
+            rows       = tables[1].find_all('tr')
+            found_old  = False
+            page_count = 0
+
+            for tr in rows:
+                cells = tr.find_all('td')
+                if len(cells) < 3:
+                    continue
+                number   = cells[0].get_text(strip=True)
+                title    = cells[1].get_text(strip=True)
+                date_str = cells[2].get_text(strip=True)
+                m = DATE_PATTERN.match(date_str)
+                if not m:
+                    continue
+                year = m.group(1)
+                if year not in TARGET_YEARS:
+                    found_old = True
+                    continue
+                a_tag      = cells[1].find('a', href=True)
+                detail_url = urljoin(BASE_URL, a_tag['href']) if a_tag else None
+                found.append({
+                    'number': number, 'title': title,
+                    'date': date_str, 'year': year,
+                    'detail_url': detail_url,
+                })
+                page_count += 1
+
+            print(f'  Page offset={offset}: found {page_count} target-year rows')
+            if found_old:
+                break
+            offset += 10
+
+        for fut in pending.values():   # pages past the last one are not needed
+            fut.cancel()
 
     print(f'  Total on website: {len(found)} circulars in {TARGET_YEARS}')
     return found
@@ -136,24 +181,28 @@ def load_db_state() -> dict:
         print(f'  ⚠️  {DB_FILE} not found — treating everything as new')
         return {}
 
-    conn  = sqlite3.connect(DB_FILE)
-    rows  = conn.execute(
+    # Stream rows straight off the cursor — no fetchall() list of tuples,
+    # and defaultdict removes the per-row "seen this number yet?" branch
+    state = defaultdict(lambda: {'languages': set(), 'topic_en': None, 'processed_at': None})
+    conn  = open_ro(DB_FILE)
+    for number, lang, topic, processed_at in conn.execute(
         'SELECT circular_number, language, topic, processed_at FROM circulars'
-    ).fetchall()
-    conn.close()
-
-    state = {}
-    for number, lang, topic, processed_at in rows:
-        if number not in state:
-            state[number] = {'languages': set(), 'topic_en': None, 'processed_at': processed_at}
-        state[number]['languages'].add(lang)
+    ):
+        entry = state[number]
+        entry['languages'].add(lang)
+        entry['processed_at'] = entry['processed_at'] or processed_at
         if lang == 'E' and topic:
-            state[number]['topic_en'] = topic
-    return state
+            entry['topic_en'] = topic
+    conn.close()
+    return dict(state)
 
 
 # ── Compare website vs DB ─────────────────────────────────────────────────────
 
+def _tokens(text: str) -> frozenset:
+    return frozenset(WORD_RE.findall(text.lower()))
+
+
 def detect_changes(website: list[dict], db_state: dict) -> dict:
     """
     Classify each website circular into one of three buckets:
@@ -165,6 +214,8 @@ def detect_changes(website: list[dict], db_state: dict) -> dict:
     missing_lang = []
     title_change = []
     up_to_date   = []
+    # Word sets of every stored EN topic, built once rather than per website row
+    stored_tokens = {num: _tokens(v.get('topic_en') or '') for num, v in db_state.items()}
 
     for c in website:
         num = c['number']
@@ -180,10 +231,12 @@ def detect_changes(website: list[dict], db_state: dict) -> dict:
             if missing:
                 c['missing_languages'] = missing
                 missing_lang.append(c)
-            # Check for title change (website title vs stored EN topic)
-            stored_topic = (stored.get('topic_en') or '').lower().strip()
-            site_title   = c['title'].lower().strip()
-            if stored_topic and site_title and stored_topic not in site_title and site_title not in stored_topic:
+            # Check for title change (website title vs stored EN topic):
+            # flag it when fewer than half the words are shared (Jaccard)
+            stored_tok = stored_tokens[num]
+            site_tok   = _tokens(c['title'])
+            if stored_tok and site_tok and \
+                    len(stored_tok & site_tok) < TITLE_OVERLAP * len(stored_tok | site_tok):
                 c['stored_topic'] = stored.get('topic_en', '')
                 title_change.append(c)
             elif not missing:
@@ -255,9 +308,7 @@ def save_report(changes: dict, scanned_at: str):
         'missing_lang' : changes['missing_lang'],
         'title_change' : changes['title_change'],
     }
-    Path(REPORT_FILE).write_text(
-        json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8'
-    )
+    Path(REPORT_FILE).write_bytes(json_bytes(report, indent=True))
     print(f'📄 Report saved → {REPORT_FILE}')
 
 
@@ -16,17 +16,26 @@ Usage:
 """
 
 import argparse
+import atexit
 import base64
+import io
 import json
 import os
 import re
 import sqlite3
+import threading
 import time
-import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 import fitz  # PyMuPDF
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared import count_sinhala, json_bytes, json_loads
 
 # ── API Keys from environment / GitHub Secrets ONLY ──────────────────────────
 GOOGLE_VISION_API_KEY = os.environ.get('GOOGLE_VISION_API_KEY', '')
@@ -36,13 +45,29 @@ DB_FILE      = 'circulars.db'
 DOWNLOAD_DIR = Path('downloads')
 TEXT_DIR     = Path('extracted_text')
 USAGE_FILE   = Path('vision_usage.json')   # persists monthly counter
+USAGE_FLUSH  = 25                          # Vision pages between counter writes (and once at exit)
 
 MONTHLY_CAP    = 1000   # Google free tier limit (pages/month)
 SAFETY_BUFFER  = 50     # reserve 50 pages for new circulars each month
 EFFECTIVE_CAP  = MONTHLY_CAP - SAFETY_BUFFER   # hard stop at 950
 
-SINHALA_RE        = re.compile(r'[\u0d80-\u0dff]')
+OCR_DPI         = 200   # render resolution for OCR pages (Tesseract always uses this)
+OCR_DPI_GRAY    = 150   # Vision resolution for pages with no colour — enough for DOCUMENT_TEXT_DETECTION
+GRAY_TOLERANCE  = 12    # max R/G/B spread in the thumbnail still counted as grey (scanner noise)
+VISION_JPEG_Q   = 85    # JPEG quality for Vision uploads — text stays crisp, ~3-5x smaller than PNG
+VISION_BATCH    = 16    # pages per images:annotate request (the API maximum)
+VISION_BATCH_BYTES = 7_000_000   # image bytes per request — base64 adds a third; JSON limit is 10 MB
+VISION_WORKERS  = 8     # Vision requests in flight at once
+VISION_INTERVAL = 0.2   # min seconds between Vision request starts (QPS guard)
+VISION_RETRIES  = 3     # retries on rate-limit / 5xx / network errors before Tesseract
+VISION_BACKOFF  = 1.0   # first retry wait in seconds — doubles each retry
+VISION_MAX_WAIT = 30.0  # cap on any single wait, including Retry-After
+VISION_RETRY_CODES = {429, 500, 502, 503, 504}
+VISION_RATE_RE     = re.compile(r'rate limit|quota|RESOURCE_EXHAUSTED', re.IGNORECASE)
+TESS_WORKERS    = os.cpu_count() or 1   # Tesseract processes for fallback pages
+
 MIN_SINHALA_RATIO = 0.05
+GARBLED_RATIO     = 0.25   # share of lone Sinhala-letter words that marks broken font extraction
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -51,37 +76,90 @@ MIN_SINHALA_RATIO = 0.05
 # count survives across GitHub Actions runs.
 # ═════════════════════════════════════════════════════════════════════════════
 
-def load_usage() -> dict:
+class UsageTracker:
+    """
+    The monthly counter, shared by the Vision worker threads. Every read and
+    update goes through one lock; updates stay in memory and are written every
+    USAGE_FLUSH pages and once more at exit.
+    """
+
+    def __init__(self, data: dict):
+        self.data    = data
+        self.lock    = threading.Lock()
+        self.unsaved = 0       # pages counted since the last write
+        self.changed = False   # anything (pages or retries) not yet on disk
+        atexit.register(self.flush)
+
+    @property
+    def pages_used(self) -> int:
+        with self.lock:
+            return self.data['pages_used']
+
+    def remaining(self) -> int:
+        return max(EFFECTIVE_CAP - self.pages_used, 0)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.data)
+
+    def increment(self, pages: int = 1):
+        """Call this ONLY after a confirmed successful Vision API call."""
+        if not pages:
+            return
+        with self.lock:
+            self.data['pages_used'] += pages
+            self.unsaved += pages
+            self.changed  = True
+            if self.unsaved >= USAGE_FLUSH:
+                self._save()
+
+    def record_retry(self, delay: float):
+        """Count a Vision retry and its wait — saved with the next write."""
+        with self.lock:
+            self.data['retries']       = self.data.get('retries', 0) + 1
+            self.data['retry_waits_s'] = round(self.data.get('retry_waits_s', 0) + delay, 1)
+            self.changed = True
+
+    def flush(self):
+        with self.lock:
+            if self.changed:
+                self._save()
+
+    def _save(self):
+        save_usage(self.data)
+        self.unsaved = 0
+        self.changed = False
+
+
+def load_usage() -> UsageTracker:
     """Load usage. Auto-resets when the month changes."""
     current_month = datetime.now().strftime('%Y-%m')
     if USAGE_FILE.exists():
         try:
             data = json.loads(USAGE_FILE.read_text(encoding='utf-8'))
             if data.get('month') == current_month:
-                return data
+                return UsageTracker(data)
         except Exception:
             pass
     # New month or corrupt file — start fresh
-    return {'month': current_month, 'pages_used': 0,
-            'last_updated': datetime.now().isoformat()}
+    return UsageTracker({'month': current_month, 'pages_used': 0,
+                         'last_updated': datetime.now().isoformat()})
 
 
 def save_usage(usage: dict):
+    """Write to a temp file and swap it in, so a killed run never leaves a half-written counter."""
     usage['last_updated'] = datetime.now().isoformat()
-    USAGE_FILE.write_text(json.dumps(usage, indent=2), encoding='utf-8')
-
+    tmp = USAGE_FILE.with_name(USAGE_FILE.name + '.tmp')
+    tmp.write_text(json.dumps(usage, indent=2), encoding='utf-8')
+    os.replace(tmp, USAGE_FILE)
 
-def can_use_vision(usage: dict) -> bool:
-    return (EFFECTIVE_CAP - usage['pages_used']) > 0
 
+def can_use_vision(usage: UsageTracker) -> bool:
+    return usage.remaining() > 0
 
-def increment_usage(usage: dict):
-    """Call this ONLY after a confirmed successful Vision API call."""
-    usage['pages_used'] += 1
-    save_usage(usage)
 
-
-def print_usage_status(usage: dict, label: str = ''):
+def print_usage_status(tracker: UsageTracker, label: str = ''):
+    usage     = tracker.snapshot()
     used      = usage['pages_used']
     remaining = max(EFFECTIVE_CAP - used, 0)
     bar_n     = int(used * 30 / MONTHLY_CAP)
@@ -93,6 +171,8 @@ def print_usage_status(usage: dict, label: str = ''):
     print(f'  Used           : {used} pages')
     print(f'  Effective cap  : {EFFECTIVE_CAP}  (free tier {MONTHLY_CAP} - buffer {SAFETY_BUFFER})')
     print(f'  Remaining      : {remaining} pages')
+    if usage.get('retries'):
+        print(f'  Retries        : {usage["retries"]}  ({usage["retry_waits_s"]}s spent waiting)')
     print(f'  [{bar}] {used}/{MONTHLY_CAP}')
     if remaining <= 0:
         print(f'  ⛔ CAP REACHED — all calls will use Tesseract fallback')
@@ -107,15 +187,12 @@ def print_usage_status(usage: dict, label: str = ''):
 # TESSERACT FALLBACK
 # ═════════════════════════════════════════════════════════════════════════════
 
-def tesseract_ocr_page(page) -> str:
-    """Fallback when Vision cap is hit. Zero API cost."""
+def tesseract_ocr_image(image: bytes) -> str:
+    """Fallback when Vision cap is hit or a Vision call fails. Zero API cost."""
     try:
         import pytesseract
         from PIL import Image
-        import io
-        mat = fitz.Matrix(200 / 72, 200 / 72)
-        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY)
-        img = Image.open(io.BytesIO(pix.tobytes('png')))
+        img = Image.open(io.BytesIO(image))
         return pytesseract.image_to_string(img, lang='sin')
     except ImportError:
         return ''
@@ -124,128 +201,299 @@ def tesseract_ocr_page(page) -> str:
         return ''
 
 
+_TESS_POOL = None
+_TESS_LOCK = threading.Lock()
+
+
+def tesseract_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes for Tesseract — started on the first fallback page and
+    reused for the rest of the run. Pages are rendered in the main process
+    (PyMuPDF documents can't be shared) and only the PNG bytes are sent over.
+    """
+    global _TESS_POOL
+    with _TESS_LOCK:
+        if _TESS_POOL is None:
+            _TESS_POOL = ProcessPoolExecutor(max_workers=TESS_WORKERS)
+        return _TESS_POOL
+
+
+def tesseract_ocr_images(images: list[bytes]) -> list[str]:
+    """OCR rendered pages across the Tesseract pool, results in input order."""
+    return list(tesseract_pool().map(tesseract_ocr_image, images))
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 # GOOGLE VISION OCR  (with cap check)
+# Pages are rendered on the main thread (PyMuPDF documents are not
+# thread-safe); only the HTTP round-trips run in the worker threads.
 # ═════════════════════════════════════════════════════════════════════════════
 
-def ocr_page(page, usage: dict) -> tuple:
+class RateLimiter:
+    """Spaces request starts at least `interval` seconds apart, across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock     = threading.Lock()
+        self.next_at  = 0.0
+
+    def wait(self):
+        with self.lock:
+            now          = time.monotonic()
+            start        = max(now, self.next_at)
+            self.next_at = start + self.interval
+        time.sleep(start - now)
+
+
+_VISION_LIMITER = RateLimiter(VISION_INTERVAL)
+
+
+def page_png(page, colorspace=None) -> bytes:
     """
-    OCR one page with cap enforcement:
-      remaining > 0  → Google Vision API  (best quality)
-      remaining <= 0 → Tesseract fallback (free, always available)
-    Returns: (text, method)  method = 'vision' | 'tesseract' | 'native'
+    Render a page at OCR_DPI as PNG (RGB unless colorspace is given).
+    Pillow encodes straight from pix.samples at zlib level 1 — several times
+    faster than MuPDF's default PNG encoder, and Tesseract doesn't care about size.
     """
-    remaining = EFFECTIVE_CAP - usage['pages_used']
+    mat = fitz.Matrix(OCR_DPI / 72, OCR_DPI / 72)
+    pix = page.get_pixmap(matrix=mat, colorspace=colorspace or fitz.csRGB, alpha=False)
+    try:
+        from PIL import Image
+    except ImportError:
+        return pix.tobytes('png')
+    mode = 'L' if pix.n == 1 else 'RGB'
+    img  = Image.frombuffer(mode, (pix.width, pix.height), pix.samples, 'raw', mode, pix.stride, 1)
+    buf  = io.BytesIO()
+    img.save(buf, 'PNG', compress_level=1)
+    return buf.getvalue()
 
-    # ── Cap check BEFORE any API call ────────────────────────────────────────
-    if remaining <= 0:
-        print(f'      ⛔ Vision cap reached ({usage["pages_used"]}/{EFFECTIVE_CAP}) → Tesseract')
-        return tesseract_ocr_page(page), 'tesseract'
 
-    if not GOOGLE_VISION_API_KEY:
-        print(f'      ⚠️  GOOGLE_VISION_API_KEY not set → Tesseract')
-        return tesseract_ocr_page(page), 'tesseract'
+def looks_grayscale(page) -> bool:
+    """True when a quarter-scale RGB thumbnail of the page has no coloured pixel."""
+    pix = page.get_pixmap(matrix=fitz.Matrix(0.25, 0.25), colorspace=fitz.csRGB, alpha=False)
+    rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(-1, 3)
+    return int((rgb.max(axis=1) - rgb.min(axis=1)).max(initial=0)) <= GRAY_TOLERANCE
+
+
+def page_jpeg(page) -> bytes:
+    """
+    Render a page as JPEG for upload — much cheaper to encode and send than PNG.
+    Grey pages (most scanned circulars) go at OCR_DPI_GRAY in one channel,
+    anything with colour at full OCR_DPI RGB.
+    """
+    if looks_grayscale(page):
+        dpi, colorspace = OCR_DPI_GRAY, fitz.csGRAY
+    else:
+        dpi, colorspace = OCR_DPI, fitz.csRGB
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), colorspace=colorspace)
+    return pix.tobytes('jpeg', jpg_quality=VISION_JPEG_Q)
+
 
-    # ── Call Vision API ───────────────────────────────────────────────────────
-    mat       = fitz.Matrix(200 / 72, 200 / 72)
-    pix       = page.get_pixmap(matrix=mat)
-    b64_image = base64.b64encode(pix.tobytes('png')).decode('utf-8')
+# One keep-alive session for every Vision call — a TLS handshake per host
+# instead of per request; the pool holds one connection per worker thread.
+# requests also asks for and decodes gzip responses.
+HTTP = requests.Session()
+HTTP.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=VISION_WORKERS))
 
-    body = json.dumps({
+
+def vision_ocr(images: list[bytes]) -> list[dict]:
+    """
+    One images:annotate call carrying every image in `images` (PNG/JPEG bytes).
+    Returns one response dict per image, in order. Raises on any HTTP / network error.
+    """
+    body = json_bytes({
         'requests': [{
-            'image'       : {'content': b64_image},
+            'image'       : {'content': base64.b64encode(image).decode('ascii')},
             'features'    : [{'type': 'DOCUMENT_TEXT_DETECTION'}],
             'imageContext': {'languageHints': ['si', 'en']}
-        }]
-    }).encode('utf-8')
+        } for image in images]
+    })
 
     url = f'https://vision.googleapis.com/v1/images:annotate?key={GOOGLE_VISION_API_KEY}'
-    req = urllib.request.Request(url, data=body,
-                                  headers={'Content-Type': 'application/json'},
-                                  method='POST')
+    _VISION_LIMITER.wait()
+    resp = HTTP.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=30)
+    resp.raise_for_status()
+    responses = json_loads(resp.content).get('responses', [])
+    return responses + [{}] * (len(images) - len(responses))
+
+
+def retry_delay(attempt: int, retry_after: str | None = None) -> float:
+    """Seconds before retry `attempt` (0-based): Retry-After if the server sent one, else 1s, 2s, 4s …"""
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read().decode('utf-8'))
-        text = result.get('responses', [{}])[0]\
-                     .get('fullTextAnnotation', {})\
-                     .get('text', '')
-        # Only increment AFTER confirmed success
-        increment_usage(usage)
-        return text, 'vision'
-
-    except urllib.error.HTTPError as e:
-        err = e.read().decode('utf-8')
-        print(f'      ❌ Vision {e.code}: {err[:150]} → Tesseract')
-        return tesseract_ocr_page(page), 'tesseract'
-    except Exception as e:
-        print(f'      ❌ Vision error: {e} → Tesseract')
-        return tesseract_ocr_page(page), 'tesseract'
+        return min(float(retry_after), VISION_MAX_WAIT)
+    except (TypeError, ValueError):
+        return min(VISION_BACKOFF * 2 ** attempt, VISION_MAX_WAIT)
+
+
+def ocr_images(images: list[bytes], usage: UsageTracker) -> list[tuple]:
+    """
+    OCR a batch of rendered pages with one Vision request (runs in a worker thread).
+    The caller has already reserved Vision budget for them.
+    Rate limits, 5xx and network errors are retried with exponential backoff;
+    Tesseract is used only once retries run out or the error is permanent.
+    Returns one (text, method) per image  method = 'vision' | 'tesseract'
+    """
+    for attempt in range(VISION_RETRIES + 1):
+        try:
+            responses = vision_ocr(images)
+            break
+        except requests.HTTPError as e:
+            code, err = e.response.status_code, e.response.text
+            if attempt == VISION_RETRIES or not (
+                    code in VISION_RETRY_CODES or VISION_RATE_RE.search(err)):
+                print(f'      ❌ Vision {code}: {err[:150]} → Tesseract')
+                return [(text, 'tesseract') for text in tesseract_ocr_images(images)]
+            reason = f'Vision {code}'
+            delay  = retry_delay(attempt, e.response.headers.get('Retry-After'))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == VISION_RETRIES:
+                print(f'      ❌ Vision error: {e} → Tesseract')
+                return [(text, 'tesseract') for text in tesseract_ocr_images(images)]
+            reason = f'Vision error: {e}'
+            delay  = retry_delay(attempt)
+        except Exception as e:
+            print(f'      ❌ Vision error: {e} → Tesseract')
+            return [(text, 'tesseract') for text in tesseract_ocr_images(images)]
+        print(f'      ↻ {reason} — retry {attempt + 1}/{VISION_RETRIES} in {delay:.1f}s')
+        usage.record_retry(delay)
+        time.sleep(delay)
+
+    # A batch can partly fail — each image carries its own error
+    results = []
+    for image, r in zip(images, responses):
+        if 'error' in r:
+            print(f'      ❌ Vision: {r["error"].get("message", "")[:150]} → Tesseract')
+            results.append((tesseract_pool().submit(tesseract_ocr_image, image).result(), 'tesseract'))
+        else:
+            results.append((r.get('fullTextAnnotation', {}).get('text', ''), 'vision'))
+    # Only increment AFTER confirmed success — Vision bills per image, not per request
+    usage.increment(sum(method == 'vision' for _, method in results))
+    return results
 
 
-def extract_text(pdf_path: Path, usage: dict) -> tuple:
+def vision_batches(doc, pages: list[int]):
+    """
+    Render `pages` for Vision and group them into requests of at most
+    VISION_BATCH images and VISION_BATCH_BYTES of image data.
+    Yields lists of (page_index, jpeg_bytes).
+    """
+    batch, size = [], 0
+    for i in pages:
+        image = page_jpeg(doc[i])
+        if batch and (len(batch) == VISION_BATCH or size + len(image) > VISION_BATCH_BYTES):
+            yield batch
+            batch, size = [], 0
+        batch.append((i, image))
+        size += len(image)
+    if batch:
+        yield batch
+
+
+def extract_text(pdf_path: Path, usage: UsageTracker) -> tuple:
     """
     Extract text from every page of a PDF.
     Per page:
       Good native Sinhala → use it, no API call
-      Needs OCR          → ocr_page() with cap enforcement
+      Needs OCR          → Vision while budget remains (pages batched into
+                           multi-image requests, VISION_WORKERS in flight,
+                           rate-limited), Tesseract for the rest
+                           (rendered here, OCR'd in the process pool)
     Returns: (full_text, stats)
     """
-    doc   = fitz.open(pdf_path)
-    parts = []
-    stats = {'native': 0, 'vision': 0, 'tesseract': 0}
+    doc      = fitz.open(pdf_path)
+    parts    = {}
+    results  = {}
+    need_ocr = []
+    stats    = {'native': 0, 'vision': 0, 'tesseract': 0}
 
     for i, page in enumerate(doc):
         native   = page.get_text().strip()
-        si_chars = len(SINHALA_RE.findall(native))
-        ratio    = si_chars / len(native) if native else 0
+        # Short pages go to OCR whatever their script — only count the long ones
+        si_chars = count_sinhala(native) if len(native) > 100 else 0
 
-        if len(native) > 100 and ratio >= MIN_SINHALA_RATIO:
-            parts.append(f'\n--- Page {i+1} [native] ---\n{native}')
+        if si_chars and si_chars / len(native) >= MIN_SINHALA_RATIO:
+            parts[i] = f'\n--- Page {i+1} [native] ---\n{native}'
             stats['native'] += 1
             print(f'      Page {i+1}: native ({len(native)} chars, {si_chars} SI)')
         else:
-            remaining = max(EFFECTIVE_CAP - usage['pages_used'], 0)
-            print(f'      Page {i+1}: OCR needed  [Vision remaining: {remaining}]...', end=' ')
-            text, method = ocr_page(page, usage)
-            si_v = len(SINHALA_RE.findall(text))
-            parts.append(f'\n--- Page {i+1} [{method}] ---\n{text}')
+            need_ocr.append(i)
+
+    if need_ocr:
+        # ── Cap check BEFORE any API call — reserve budget for the whole PDF ──
+        remaining = usage.remaining()
+        n_vision  = min(len(need_ocr), remaining) if GOOGLE_VISION_API_KEY else 0
+        print(f'      {len(need_ocr)} page(s) need OCR  [Vision remaining: {remaining}]')
+        if not GOOGLE_VISION_API_KEY:
+            print(f'      ⚠️  GOOGLE_VISION_API_KEY not set → Tesseract')
+        elif n_vision < len(need_ocr):
+            print(f'      ⛔ Vision cap reached ({usage.pages_used}/{EFFECTIVE_CAP}) → '
+                  f'Tesseract for {len(need_ocr) - n_vision} page(s)')
+
+        with ThreadPoolExecutor(max_workers=VISION_WORKERS) as pool:
+            futures = [([i for i, _ in batch], pool.submit(ocr_images, [im for _, im in batch], usage))
+                       for batch in vision_batches(doc, need_ocr[:n_vision])]
+            tess    = {i: tesseract_pool().submit(tesseract_ocr_image, page_png(doc[i], colorspace=fitz.csGRAY))
+                       for i in need_ocr[n_vision:]}
+            for pages, fut in futures:
+                results.update(zip(pages, fut.result()))
+            for i, fut in tess.items():
+                results[i] = fut.result(), 'tesseract'
+
+        for i in need_ocr:
+            text, method = results[i]
+            si_v = count_sinhala(text)
+            parts[i] = f'\n--- Page {i+1} [{method}] ---\n{text}'
             stats[method] += 1
-            print(f'{len(text)} chars, {si_v} SI [{method}]')
-            time.sleep(0.2)
+            print(f'      Page {i+1}: OCR {len(text)} chars, {si_v} SI [{method}]')
 
     doc.close()
-    return ''.join(parts), stats
+    return ''.join(parts[i] for i in sorted(parts)), stats
 
 
 # ═════════════════════════════════════════════════════════════════════════════
 # GARBLED DETECTION
 # ═════════════════════════════════════════════════════════════════════════════
 
+def garbled_ratio(text: str) -> float:
+    """Share of words that are a single Sinhala letter — the lone one-letter words
+    are joined and counted in one pass instead of matching each word."""
+    words = text.split()
+    if not words:
+        return 0.0
+    return count_sinhala(''.join(w for w in words if len(w) == 1)) / len(words)
+
+
 def is_garbled(text: str) -> bool:
-    if not text:
-        return False
-    words     = text.split()
-    single_si = sum(1 for w in words if len(w) == 1 and SINHALA_RE.match(w))
-    return (single_si / len(words) > 0.25) if words else False
+    # Text with no Sinhala at all (English circulars) can't be garbled — skip the split
+    return bool(text) and count_sinhala(text) > 0 and garbled_ratio(text) > GARBLED_RATIO
+
+
+_conn = None
+
+
+def db() -> sqlite3.Connection:
+    """One connection for the whole run — opened on first use, reused by every read and update."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_FILE)
+    return _conn
 
 
 def get_garbled_rows() -> list:
-    conn = sqlite3.connect(DB_FILE)
-    rows = conn.execute(
+    rows = db().execute(
         "SELECT circular_number, issued_date, topic, summary, pdf_path "
         "FROM circulars WHERE language='S'"
     ).fetchall()
-    conn.close()
     result = []
     for number, date, topic, summary, pdf_path in rows:
         combined = (topic or '') + ' ' + (summary or '')
-        if len(SINHALA_RE.findall(combined)) > 0 and is_garbled(combined):
-            words     = combined.split()
-            single_si = sum(1 for w in words if len(w) == 1 and SINHALA_RE.match(w))
+        if not count_sinhala(combined):
+            continue
+        ratio    = garbled_ratio(combined)
+        if ratio > GARBLED_RATIO:
             result.append({
                 'number'  : number, 'date': date or '',
                 'topic'   : topic or '', 'pdf_path': pdf_path or '',
-                'garbled_ratio': round(single_si / len(words), 2) if words else 0,
+                'garbled_ratio': round(ratio, 2),
             })
     return result
 
@@ -254,6 +502,25 @@ def get_garbled_rows() -> list:
 # HELPERS
 # ═════════════════════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=1)
+def sinhala_pdf_index() -> tuple[dict, list]:
+    """
+    One walk of DOWNLOAD_DIR for every PDF in a Sinhala/ folder, reused for the
+    whole run (call sinhala_pdf_index.cache_clear() after new downloads).
+    Returns ({file name: (folder no., path)}, [paths in walk order]).
+    """
+    by_name, pdfs = {}, []
+    for n, (root, _dirs, files) in enumerate(os.walk(DOWNLOAD_DIR)):
+        if os.path.basename(root) != 'Sinhala':
+            continue
+        for f in files:
+            if f.endswith('.pdf'):
+                p = Path(root) / f
+                by_name.setdefault(f, (n, p))
+                pdfs.append(p)
+    return by_name, pdfs
+
+
 def find_pdf(row: dict) -> Path | None:
     if row['pdf_path']:
         p = Path(row['pdf_path'].replace('\\', '/'))
@@ -262,13 +529,14 @@ def find_pdf(row: dict) -> Path | None:
     safe_num   = ''.join(c for c in row['number'].replace('/', '-') if c not in ':*?"<>|').strip()
     year_match = re.search(r'(20\d\d)', row['number'])
     year       = year_match.group(1) if year_match else None
-    for d in DOWNLOAD_DIR.rglob('Sinhala'):
-        for v in [safe_num + '.pdf', re.sub(r'\s*\(.*?\)', '', safe_num).strip() + '.pdf']:
-            p = d / v
-            if p.exists():
-                return p
+    by_name, pdfs = sinhala_pdf_index()
+    # Exact file name first — earliest folder wins, as the per-folder lookup did
+    hits = [by_name[v] for v in (safe_num + '.pdf', re.sub(r'\s*\(.*?\)', '', safe_num).strip() + '.pdf')
+            if v in by_name]
+    if hits:
+        return min(hits, key=lambda h: h[0])[1]
     prefix = row['number'].split('/')[0].strip()
-    for pdf in DOWNLOAD_DIR.rglob('Sinhala/*.pdf'):
+    for pdf in pdfs:
         if pdf.stem.startswith(prefix + '-') and (not year or year in pdf.stem):
             return pdf
     return None
@@ -282,13 +550,12 @@ def save_txt(number: str, year: str, text: str):
 
 
 def update_db(number: str, topic: str, summary: str):
-    conn = sqlite3.connect(DB_FILE)
+    conn = db()
     conn.execute(
         "UPDATE circulars SET topic=?, summary=? WHERE circular_number=? AND language='S'",
         (topic, summary, number)
     )
     conn.commit()
-    conn.close()
 
 
 def resummarise_with_groq(number: str, date: str, text: str) -> dict | None:
@@ -325,7 +592,7 @@ def resummarise_with_groq(number: str, date: str, text: str) -> dict | None:
 # TEST MODE
 # ═════════════════════════════════════════════════════════════════════════════
 
-def test_one_pdf(pdf_name: str, usage: dict):
+def test_one_pdf(pdf_name: str, usage: UsageTracker):
     matches  = list(DOWNLOAD_DIR.rglob(f'*{Path(pdf_name).name}'))
     pdf_path = matches[0] if matches else Path(pdf_name)
     if not pdf_path.exists():
@@ -334,7 +601,7 @@ def test_one_pdf(pdf_name: str, usage: dict):
 
     print(f'\n── Vision OCR Test: {pdf_path} ──\n')
     text, stats = extract_text(pdf_path, usage)
-    si_chars    = len(SINHALA_RE.findall(text))
+    si_chars    = count_sinhala(text)
 
     print(f'\n{"─"*50}')
     print(f'Total chars  : {len(text)}')
@@ -381,7 +648,7 @@ def main():
 
     for i, row in enumerate(garbled, 1):
         print(f'[{i}/{len(garbled)}] {row["number"]}  '
-              f'[Vision remaining: {max(EFFECTIVE_CAP - usage["pages_used"], 0)}]')
+              f'[Vision remaining: {usage.remaining()}]')
 
         pdf_path = find_pdf(row)
         if not pdf_path:
@@ -390,7 +657,7 @@ def main():
             continue
 
         print(f'  📄 {pdf_path}')
-        pages_before = usage['pages_used']
+        pages_before = usage.pages_used
 
         try:
             text, stats = extract_text(pdf_path, usage)
@@ -400,7 +667,7 @@ def main():
             continue
 
         vision_this_run += stats.get('vision', 0)
-        si_chars = len(SINHALA_RE.findall(text))
+        si_chars = count_sinhala(text)
         print(f'  {len(text)} chars, {si_chars} SI  '
               f'[native:{stats["native"]} vision:{stats["vision"]} tess:{stats["tesseract"]}]')
 
@@ -419,7 +686,7 @@ def main():
         if summary and summary.get('topic'):
             topic  = summary.get('topic', '')
             summ   = summary.get('summary', '')
-            si_new = len(SINHALA_RE.findall(topic + summ))
+            si_new = count_sinhala(topic + summ)
             update_db(row['number'], topic, summ)
             if si_new > 5 and not is_garbled(topic):
                 print(f'  ✅ {topic[:60]}')
@@ -431,6 +698,7 @@ def main():
             failed += 1
 
     # ── Show usage at END ──
+    usage.flush()
     print_usage_status(usage, label='END OF RUN')
 
     print(f'{"="*60}')
@@ -438,8 +706,8 @@ def main():
     print(f'  Skipped            : {skipped}')
     print(f'  Failed             : {failed}')
     print(f'  Vision pages used  : {vision_this_run} this run')
-    print(f'  Monthly total      : {usage["pages_used"]} / {MONTHLY_CAP}')
-    print(f'  Remaining free     : {max(EFFECTIVE_CAP - usage["pages_used"], 0)}')
+    print(f'  Monthly total      : {usage.pages_used} / {MONTHLY_CAP}')
+    print(f'  Remaining free     : {usage.remaining()}')
     print(f'{"="*60}\n')
 
 
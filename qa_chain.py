@@ -13,13 +13,17 @@ Used by app.py — can also be tested from the CLI:
     python qa_chain.py
 """
 
-import json
 import os
-import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional
 
 import chromadb
-from chromadb.utils import embedding_functions
+
+from build_vectorstore import make_embed_fn
+from db import open_ro
+from shared import json_loads
 
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
@@ -28,43 +32,100 @@ from langchain_core.output_parsers import StrOutputParser
 # ── Config ────────────────────────────────────────────────────────────────────
 CHROMA_DIR  = "./chroma_db"
 COLLECTION  = "circulars"
-EMBED_MODEL = "all-MiniLM-L6-v2"
 GROQ_MODEL  = "llama-3.1-8b-instant"   # fastest on Groq free tier
 DEFAULT_K   = 5                          # circulars to retrieve per query
+RETRIEVE_CACHE_SIZE = 512                # memoised retrieve() results
 DB_FILE     = "./circulars.db"
 
 
+_db_conn = None   # (mtime, connection)
+_db_lock = threading.Lock()
+
+
+def _db():
+    """
+    One read-only connection shared by every thread, kept open so each query skips
+    the connect + schema parse and reuses SQLite's cached prepared statement.
+    Keyed on the file's mtime (like app.py's _conn), so a rewritten DB is reopened.
+    Not per-thread: Streamlit runs every rerun on a fresh thread.
+    """
+    global _db_conn
+    sig = os.stat(DB_FILE).st_mtime_ns
+    with _db_lock:
+        if _db_conn is None or _db_conn[0] != sig:
+            _db_conn = (sig, open_ro(DB_FILE, check_same_thread=False))
+        return _db_conn[1]
+
+
 def _fetch_pdf_paths(circular_numbers: list[str]) -> dict[str, str]:
     """Look up pdf_path for a list of circular numbers from SQLite."""
     if not circular_numbers or not os.path.exists(DB_FILE):
         return {}
     try:
-        conn = sqlite3.connect(DB_FILE)
         placeholders = ",".join("?" * len(circular_numbers))
-        rows = conn.execute(
+        rows = _db().execute(
             f"SELECT circular_number, pdf_path FROM circulars WHERE circular_number IN ({placeholders})",
             circular_numbers
         ).fetchall()
-        conn.close()
-        return {r[0]: r[1] or "" for r in rows}
+        return {number: pdf_path or "" for number, pdf_path in rows}
     except Exception:
         return {}
 
 # ── Singletons (loaded once per Streamlit session) ───────────────────────────
 _collection = None
+_embed_fn   = None
 _llm_cache  = {}
+_hits_cache = OrderedDict()   # retrieve() LRU: key → tuple of hit dicts
+_hits_lock  = threading.Lock()
+
+
+def get_embed_fn():
+    """
+    One SentenceTransformer per process, shared by every collection handle and embed_query.
+    Warmed with a throwaway query on load, so the first real question doesn't pay
+    for the ONNX session / tokenizer start-up.
+    """
+    global _embed_fn
+    if _embed_fn is None:
+        # Same backend/normalisation as the stored vectors
+        fn = make_embed_fn()
+        fn(["warm-up"])
+        _embed_fn = fn
+    return _embed_fn
+
+
+def open_collection():
+    """Load the embedding model and open the Chroma collection (slow — cache the result)."""
+    client = chromadb.PersistentClient(path=CHROMA_DIR)
+    embed_fn = get_embed_fn()
+    col = client.get_collection(name=COLLECTION, embedding_function=embed_fn)
+    warning = store_mismatch(col)
+    if warning:
+        print(f"⚠️  {warning}")
+    return col
+
+
+def store_mismatch(col) -> Optional[str]:
+    """
+    Why the stored vectors don't fit this process's queries, or None if they do.
+    A store with no recorded backend predates the check and counts as a mismatch.
+    """
+    meta       = col.metadata or {}
+    built_with = meta.get("embed_backend")
+    backend    = get_embed_fn().backend
+    if built_with != backend:
+        return (f"Vector store embedded with {built_with or 'an unrecorded backend'} but queries "
+                f"use {backend} — run: python build_vectorstore.py --rebuild")
+    if meta.get("hnsw:space") != "ip":
+        return (f"Vector store uses hnsw:space={meta.get('hnsw:space', 'l2')}, not ip, so relevance "
+                f"scores are off — run: python build_vectorstore.py --rebuild")
+    return None
 
 
 def get_collection():
     global _collection
     if _collection is None:
-        embed_fn    = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=EMBED_MODEL
-        )
-        client      = chromadb.PersistentClient(path=CHROMA_DIR)
-        _collection = client.get_collection(
-            name=COLLECTION, embedding_function=embed_fn
-        )
+        _collection = open_collection()
     return _collection
 
 
@@ -81,56 +142,120 @@ def get_llm(api_key: str) -> ChatGroq:
 
 # ── Retrieval ─────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=1024)
+def embed_query(text: str) -> tuple[float, ...]:
+    """Query embedding, memoised — suggested questions and repeats skip the model entirely."""
+    return tuple(float(x) for x in get_embed_fn()([text])[0])
+
+
 def retrieve(question: str,
              lang_filter: Optional[str] = None,
-             n: int = DEFAULT_K) -> list[dict]:
+             n: int = DEFAULT_K,
+             collection=None) -> list[dict]:
     """
     Semantic search in ChromaDB.
     lang_filter: 'E' = English only, 'S' = Sinhala only, None = both
+    collection : an already-open collection (e.g. the app's cached one); defaults to the module singleton
     Returns list of hit dicts sorted by relevance.
+    Results are memoised per (normalised question, filters, n) — repeats and
+    Streamlit reruns skip the embedding and the vector search.
+    """
+    return retrieve_many([question], lang_filter, n, collection)[0]
+
+
+def retrieve_many(questions: list[str],
+                  lang_filter: Optional[str] = None,
+                  n: int = DEFAULT_K,
+                  collection=None) -> list[list[dict]]:
     """
-    col = get_collection()
+    retrieve() for several questions with the same filters: the ones not in the
+    memo are embedded in one model call and searched with one Chroma query.
+    Returns one hit list per question, in input order.
+    """
+    # MiniLM is uncased and ignores spacing, so this key never changes the result
+    q_norms = [" ".join(q.split()).lower() for q in questions]
+    found   = {}
+    with _hits_lock:
+        for q in q_norms:
+            hits = _hits_cache.get((q, lang_filter, n))
+            if hits is not None:
+                _hits_cache.move_to_end((q, lang_filter, n))
+                found[q] = hits
+    misses = [q for q in dict.fromkeys(q_norms) if q not in found]
+    if misses:
+        searched = [tuple(hits) for hits in _search(misses, lang_filter, n, collection)]
+        found.update(zip(misses, searched))
+        with _hits_lock:
+            for q, hits in zip(misses, searched):
+                _hits_cache[(q, lang_filter, n)] = hits
+            while len(_hits_cache) > RETRIEVE_CACHE_SIZE:
+                _hits_cache.popitem(last=False)
+    return [[dict(h) for h in found[q]] for q in q_norms]   # callers get their own dicts
+
+
+def clear_retrieval_cache():
+    """Forget memoised search results — call after the vector store is rebuilt."""
+    with _hits_lock:
+        _hits_cache.clear()
+
+
+def _embed_many(texts: list[str]) -> list[list[float]]:
+    """One model call for all texts — a lone text goes through the embed_query memo."""
+    if len(texts) == 1:
+        return [list(embed_query(texts[0]))]
+    return [[float(x) for x in e] for e in get_embed_fn()(texts)]
+
+
+def _to_hit(doc: str, meta: dict, dist: float) -> dict:
+    # Parse stored key_instructions back to list (truncated at 500 chars → may not parse)
+    try:
+        ki = json_loads(meta.get("key_instructions_json") or "[]")
+    except ValueError:
+        ki = []
+
+    return {
+        "document"        : doc,
+        "circular_number" : meta.get("circular_number", ""),
+        "topic"           : meta.get("topic", ""),
+        "issued_date"     : meta.get("issued_date", ""),
+        "issued_by"       : meta.get("issued_by", ""),
+        "applies_to"      : meta.get("applies_to", ""),
+        "deadline"        : meta.get("deadline", ""),
+        "language"        : meta.get("language", "E"),
+        "summary"         : meta.get("summary", ""),
+        "key_instructions": ki,
+        "relevance_score" : round((1 - dist) * 100, 1),   # ip distance = 1 − cos (unit vectors) → %
+        "pdf_path"        : "",   # filled in by _search
+    }
+
+
+def _search(questions: list[str],
+            lang_filter: Optional[str],
+            n: int,
+            collection) -> list[list[dict]]:
+    """Uncached retrieve_many(): embed, query Chroma once, enrich hits with pdf_path."""
+    col = collection if collection is not None else get_collection()
     where = {"language": lang_filter} if lang_filter in ("E", "S") else None
 
     results = col.query(
-        query_texts=[question],
+        query_embeddings=_embed_many(questions),
         n_results=n,
         where=where,
     )
 
-    hits = []
-    for doc, meta, dist in zip(
-        results["documents"][0],
-        results["metadatas"][0],
-        results["distances"][0],
-    ):
-        # Parse stored key_instructions back to list
-        try:
-            ki = json.loads(meta.get("key_instructions_json", "[]"))
-        except Exception:
-            ki = []
-
-        hits.append({
-            "document"        : doc,
-            "circular_number" : meta.get("circular_number", ""),
-            "topic"           : meta.get("topic", ""),
-            "issued_date"     : meta.get("issued_date", ""),
-            "issued_by"       : meta.get("issued_by", ""),
-            "applies_to"      : meta.get("applies_to", ""),
-            "deadline"        : meta.get("deadline", ""),
-            "language"        : meta.get("language", "E"),
-            "summary"         : meta.get("summary", ""),
-            "key_instructions": ki,
-            "relevance_score" : round((1 - dist) * 100, 1),   # cosine → %
-            "pdf_path"        : "",   # filled in below
-        })
-
-    # ── Enrich hits with pdf_path from SQLite ────────────────────────────────
-    pdf_map = _fetch_pdf_paths([h["circular_number"] for h in hits])
-    for h in hits:
-        h["pdf_path"] = pdf_map.get(h["circular_number"], "")
-
-    return hits
+    all_hits = [
+        [_to_hit(doc, meta, dist) for doc, meta, dist in zip(docs, metas, dists)]
+        for docs, metas, dists in zip(
+            results["documents"], results["metadatas"], results["distances"])
+    ]
+
+    # ── Enrich hits with pdf_path from SQLite — one lookup for every question ─
+    pdf_map = _fetch_pdf_paths(list({h["circular_number"] for hits in all_hits for h in hits}))
+    for hits in all_hits:
+        for h in hits:
+            h["pdf_path"] = pdf_map.get(h["circular_number"], "")
+
+    return all_hits
 
 
 # ── Prompt ────────────────────────────────────────────────────────────────────
@@ -149,32 +274,60 @@ _HUMAN = """{question}
 Give a clear, structured answer. Include circular numbers, dates, and key details."""
 
 
+# Built once at import — only the context and question change per call
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _SYSTEM),
+    ("human",  _HUMAN),
+])
+
+_HIT_FMT = (
+    "[{0}] Circular {1}  |  {2}  |  {3}  |  Relevance: {4}%\n"
+    "Topic: {5}\n"
+    "Summary: {6}\n"
+    "Key Instructions:\n{7}\n"
+    "Applies To: {8}\n"
+    "Deadline: {9}\n"
+    "Issued By: {10}"
+).format
+_KI_FMT     = "    • {}".format
+_LANG_LABEL = {"E": "English"}
+
+
+def _fmt_hit(i: int, h: dict) -> str:
+    ki = h["key_instructions"]
+    return _HIT_FMT(
+        i, h["circular_number"], h["issued_date"],
+        _LANG_LABEL.get(h["language"], "Sinhala (සිංහල)"), h["relevance_score"],
+        h["topic"], h["summary"],
+        "\n".join(map(_KI_FMT, ki)) if ki else "    (not extracted)",
+        h["applies_to"] or "not specified", h["deadline"] or "none", h["issued_by"],
+    )
+
+
 def _build_context(hits: list[dict]) -> str:
-    parts = []
-    for i, h in enumerate(hits, 1):
-        lang = "English" if h["language"] == "E" else "Sinhala (සිංහල)"
-        ki   = "\n".join(f"    • {x}" for x in h["key_instructions"]) \
-               if h["key_instructions"] else "    (not extracted)"
-        parts.append(
-            f"[{i}] Circular {h['circular_number']}  |  {h['issued_date']}  |  {lang}  "
-            f"|  Relevance: {h['relevance_score']}%\n"
-            f"Topic: {h['topic']}\n"
-            f"Summary: {h['summary']}\n"
-            f"Key Instructions:\n{ki}\n"
-            f"Applies To: {h['applies_to'] or 'not specified'}\n"
-            f"Deadline: {h['deadline'] or 'none'}\n"
-            f"Issued By: {h['issued_by']}"
-        )
-    return "\n\n" + "\n\n---\n\n".join(parts)
+    return "\n\n" + "\n\n---\n\n".join(map(_fmt_hit, range(1, len(hits) + 1), hits))
 
 
 # ── Main Q&A entry point ──────────────────────────────────────────────────────
 
+def _build_chain(api_key: str):
+    return _PROMPT | get_llm(api_key) | StrOutputParser()
+
+
+def _no_hits(question: str) -> dict:
+    return {
+        "answer"  : "No relevant circulars found in the vector store for your question.",
+        "sources" : [],
+        "question": question,
+    }
+
+
 def answer_question(
     question   : str,
     api_key    : str,
     lang_filter: Optional[str] = None,
     n_results  : int = DEFAULT_K,
+    collection = None,
 ) -> dict:
     """
     Full RAG pipeline. Returns:
@@ -188,21 +341,13 @@ def answer_question(
         raise ValueError("GROQ_API_KEY is required")
 
     # Step 1 — retrieve
-    hits = retrieve(question, lang_filter=lang_filter, n=n_results)
+    hits = retrieve(question, lang_filter=lang_filter, n=n_results,
+                    collection=collection)
     if not hits:
-        return {
-            "answer"  : "No relevant circulars found in the vector store for your question.",
-            "sources" : [],
-            "question": question,
-        }
+        return _no_hits(question)
 
     # Step 2 — build chain
-    llm    = get_llm(api_key)
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", _SYSTEM),
-        ("human",  _HUMAN),
-    ])
-    chain = prompt | llm | StrOutputParser()
+    chain = _build_chain(api_key)
 
     # Step 3 — invoke
     answer = chain.invoke({
@@ -217,6 +362,43 @@ def answer_question(
     }
 
 
+def answer_questions(
+    questions      : list[str],
+    api_key        : str,
+    lang_filter    : Optional[str] = None,
+    n_results      : int = DEFAULT_K,
+    collection     = None,
+    max_concurrency: int = 4,
+) -> list[dict]:
+    """
+    Batch answer_question: retrieval is one embedding call + one Chroma query
+    (retrieve_many), then the Groq calls go out together via chain.batch (up to
+    max_concurrency in flight), so N questions cost about one round-trip of
+    latency instead of N. Results keep the input order.
+    """
+    if not api_key:
+        raise ValueError("GROQ_API_KEY is required")
+
+    all_hits = retrieve_many(questions, lang_filter=lang_filter, n=n_results,
+                             collection=collection)
+    results  = [_no_hits(q) for q in questions]
+    todo     = [i for i, hits in enumerate(all_hits) if hits]
+    if not todo:
+        return results
+
+    answers = _build_chain(api_key).batch(
+        [{"context": _build_context(all_hits[i]), "question": questions[i]} for i in todo],
+        config={"max_concurrency": max_concurrency},
+    )
+    for i, answer in zip(todo, answers):
+        results[i] = {
+            "answer"  : answer.strip(),
+            "sources" : all_hits[i],
+            "question": questions[i],
+        }
+    return results
+
+
 # ── CLI smoke test ────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import sys
@@ -234,10 +416,10 @@ if __name__ == "__main__":
         "Tell me about festival advance payments",
     ]
 
-    for q in TEST_QUESTIONS:
+    # One batch — the Groq calls overlap instead of running back to back
+    for q, res in zip(TEST_QUESTIONS, answer_questions(TEST_QUESTIONS, api_key)):
         print(f"\n{'='*62}")
         print(f"Q: {q}")
-        res = answer_question(q, api_key)
         print(f"\nA: {res['answer'][:300]}...")
         print(f"\nTop sources:")
         for s in res["sources"][:3]:
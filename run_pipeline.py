@@ -362,6 +362,8 @@ def init_db():
             UNIQUE(circular_number, language)
         )
     ''')
+    # The app's Browse / Dashboard queries filter by language and sort by date
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_lang_date ON circulars(language, issued_date)')
     conn.commit()
     conn.close()
 
@@ -375,7 +377,7 @@ def get_known_pairs() -> set:
     conn = sqlite3.connect(DB_FILE)
     rows = conn.execute("SELECT circular_number, language FROM circulars").fetchall()
     conn.close()
-    return {(r[0], r[1]) for r in rows}
+    return set(rows)   # rows are already (circular_number, language) tuples
 
 
 def save_to_db(circular: dict, summary: dict, lang_code: str,
@@ -0,0 +1,36 @@
+"""
+shared.py — small helpers used by several scripts
+==================================================
+  - count_sinhala  — Sinhala-block character count (OCR / report scripts)
+  - json_loads     — orjson when installed, else the stdlib; accepts str or bytes
+  - json_bytes     — UTF-8 JSON bytes, optionally indented (reports, API bodies)
+
+orjson parses and serialises several times faster than the stdlib json module
+and works on bytes directly; everything here falls back to the stdlib without it.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def count_sinhala(text: str) -> int:
+    """Sinhala-block (U+0D80–U+0DFF) characters, counted with one vectorised compare."""
+    import numpy as np   # here, not at the top: the JSON-only importers shouldn't need numpy
+    cp = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    return int(np.count_nonzero((cp >= 0x0D80) & (cp <= 0x0DFF)))
+
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_bytes(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+else:
+    json_loads = json.loads   # accepts UTF-8 bytes too
+
+    def json_bytes(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")